@@ -1,13 +1,44 @@
 """
-Audio transcription module using OpenAI Whisper.
+Audio transcription module using faster-whisper (CTranslate2 Whisper).
 Transcribes audio with timestamps for precise clip extraction.
 """
 
-import os
-import whisper
-from typing import List, Dict
-from moviepy.editor import VideoFileClip
-from config import settings
+import functools
+import logging
+import subprocess
+import av
+import ctranslate2
+import numpy as np
+from faster_whisper import WhisperModel
+from typing import List, Dict, NamedTuple, Optional, Tuple
+
+log = logging.getLogger(__name__)
+
+# Whisper models expect 16 kHz mono input
+SAMPLE_RATE = 16000
+
+# Silence inserted between windows batched into one transcription
+WINDOW_GAP = 1.0
+
+
+class Segment(NamedTuple):
+    """A transcript segment with timestamps in seconds."""
+    start: float
+    end: float
+    text: str
+
+
+@functools.lru_cache(maxsize=4)
+def _load_model(model_size: str) -> WhisperModel:
+    """Load a Whisper model once per process and share it."""
+    # FP16 on tensor cores when a GPU is present, int8 quantization on CPU
+    if ctranslate2.get_cuda_device_count() > 0:
+        device, compute_type = "cuda", "float16"
+    else:
+        device, compute_type = "cpu", "int8"
+    
+    log.info("Loading Whisper model: %s (%s, %s)", model_size, device, compute_type)
+    return WhisperModel(model_size, device=device, compute_type=compute_type)
 
 
 class AudioTranscriber:
@@ -15,31 +46,84 @@ class AudioTranscriber:
     
     def __init__(self, model_size: str = "base"):
         """
-        Initialize transcriber with Whisper model.
+        Initialize transcriber. The Whisper model is loaded on first use.
         
         Args:
             model_size: Whisper model size (tiny, base, small, medium, large)
         """
-        print(f"Loading Whisper model: {model_size}")
-        self.model = whisper.load_model(model_size)
+        self._model_size = model_size
+        
+        # (segments, starts, ends) of the last transcript, for range
+        # lookups; replaced as one tuple so concurrent jobs never see
+        # mismatched arrays
+        self._segment_index = None
+    
+    @property
+    def model(self) -> WhisperModel:
+        """Whisper model, loaded lazily and shared across instances."""
+        return _load_model(self._model_size)
         
-    def extract_audio(self, video_path: str) -> str:
+    def extract_audio(self, video_path: str,
+                      start: Optional[float] = None,
+                      duration: Optional[float] = None) -> np.ndarray:
         """
         Extract audio from video file.
         
         Args:
             video_path: Path to video file
+            start: Optional start time in seconds
+            duration: Optional duration in seconds
             
         Returns:
-            Path to extracted audio file
+            Float32 waveform sampled at 16 kHz mono
         """
-        audio_path = os.path.join(settings.temp_dir, "temp_audio.wav")
+        # Stream raw 16 kHz mono PCM from FFmpeg's stdout, no temp file
+        cmd = ["ffmpeg"]
+        if start is not None:
+            cmd += ["-ss", f"{start:.3f}"]
+        cmd += ["-i", video_path]
+        if duration is not None:
+            cmd += ["-t", f"{duration:.3f}"]
+        cmd += [
+            "-vn", "-f", "s16le", "-ac", "1", "-ar", str(SAMPLE_RATE),
+            "-loglevel", "error",
+            "-",
+        ]
+        
+        try:
+            raw = subprocess.run(cmd, check=True, capture_output=True).stdout
+            return np.frombuffer(raw, np.int16).astype(np.float32) / 32768.0
+        except FileNotFoundError:
+            # FFmpeg binary not on PATH, fall back to PyAV's bundled libav
+            audio = self._extract_audio_pyav(video_path)
+            first = int((start or 0) * SAMPLE_RATE)
+            last = first + int(duration * SAMPLE_RATE) if duration is not None else None
+            return audio[first:last]
+        except subprocess.CalledProcessError as e:
+            stderr = e.stderr.decode(errors="ignore").strip() if e.stderr else ""
+            raise Exception(f"Failed to extract audio: {stderr or str(e)}")
+    
+    def _extract_audio_pyav(self, video_path: str) -> np.ndarray:
+        """
+        Extract audio with PyAV when the FFmpeg binary is unavailable.
         
+        Only the audio stream is demuxed and decoded; video packets are skipped.
+        """
         try:
-            video = VideoFileClip(video_path)
-            video.audio.write_audiofile(audio_path, verbose=False, logger=None)
-            video.close()
-            return audio_path
+            pcm = bytearray()
+            resampler = av.AudioResampler(format='s16', layout='mono', rate=SAMPLE_RATE)
+            
+            with av.open(video_path) as container:
+                stream = container.streams.audio[0]
+                for frame in container.decode(stream):
+                    for resampled in resampler.resample(frame):
+                        pcm += resampled.to_ndarray().tobytes()
+                
+                # Flush samples buffered in the resampler
+                for resampled in resampler.resample(None):
+                    pcm += resampled.to_ndarray().tobytes()
+            
+            return np.frombuffer(pcm, np.int16).astype(np.float32) / 32768.0
         except Exception as e:
             raise Exception(f"Failed to extract audio: {str(e)}")
     
@@ -54,42 +138,86 @@ class AudioTranscriber:
             Dictionary containing full text and segments with timestamps
         """
         # Extract audio from video
-        audio_path = self.extract_audio(video_path)
+        audio = self.extract_audio(video_path)
         
+        result = self._transcribe_audio(audio)
+        self._index_segments(result['segments'])
+        
+        return result
+    
+    def transcribe_windows(self, video_path: str,
+                           windows: List[Tuple[float, float]]) -> Dict:
+        """
+        Transcribe only selected time windows of a video.
+        
+        The windows are joined with short silences and sent to Whisper as a
+        single batch, then timestamps are shifted back to video time.
+        
+        Args:
+            video_path: Path to video file
+            windows: List of (start, end) times in seconds
+            
+        Returns:
+            Dictionary containing text and segments with video timestamps
+        """
+        silence = np.zeros(int(WINDOW_GAP * SAMPLE_RATE), dtype=np.float32)
+        pieces = []
+        offsets = []  # (start in batched audio, start in video)
+        position = 0.0
+        
+        for start, end in sorted(windows):
+            audio = self.extract_audio(video_path, start=start, duration=end - start)
+            offsets.append((position, start))
+            pieces.extend([audio, silence])
+            position += len(audio) / SAMPLE_RATE + WINDOW_GAP
+        
+        if not pieces:
+            return {'text': '', 'segments': [], 'language': 'en'}
+        
+        result = self._transcribe_audio(np.concatenate(pieces))
+        
+        # Map each segment back to the window it was transcribed from
+        batch_starts = np.array([offset[0] for offset in offsets])
+        shifted = []
+        for seg in result['segments']:
+            i = max(int(np.searchsorted(batch_starts, seg.start, side='right')) - 1, 0)
+            shift = offsets[i][1] - offsets[i][0]
+            shifted.append(seg._replace(start=seg.start + shift, end=seg.end + shift))
+        
+        result['segments'] = shifted
+        self._index_segments(shifted)
+        
+        return result
+    
+    def _transcribe_audio(self, audio: np.ndarray) -> Dict:
+        """Run Whisper on a 16 kHz mono waveform."""
         try:
-            # Transcribe with word-level timestamps
-            result = self.model.transcribe(
-                audio_path,
+            # Transcribe with word-level timestamps, skipping silence via VAD
+            segments_iter, info = self.model.transcribe(
+                audio,
                 word_timestamps=True,
-                verbose=False
+                vad_filter=True
             )
             
-            # Clean up temp audio
-            if os.path.exists(audio_path):
-                os.remove(audio_path)
-            
-            # Format segments
+            # Format segments (decoding happens lazily while iterating)
             segments = []
-            for segment in result['segments']:
-                segments.append({
-                    'start': segment['start'],
-                    'end': segment['end'],
-                    'text': segment['text'].strip(),
-                })
+            texts = []
+            for segment in segments_iter:
+                texts.append(segment.text)
+                segments.append(
+                    Segment(segment.start, segment.end, segment.text.strip())
+                )
             
             return {
-                'text': result['text'],
+                'text': "".join(texts),
                 'segments': segments,
-                'language': result.get('language', 'en'),
+                'language': info.language or 'en',
             }
         except Exception as e:
-            # Clean up temp audio on error
-            if os.path.exists(audio_path):
-                os.remove(audio_path)
             raise Exception(f"Failed to transcribe audio: {str(e)}")
     
-    def get_segments_in_range(self, segments: List[Dict], 
-                               start_time: float, end_time: float) -> List[Dict]:
+    def get_segments_in_range(self, segments: List[Segment], 
+                               start_time: float, end_time: float) -> List[Segment]:
         """
         Get transcript segments within a time range.
         
@@ -101,7 +229,27 @@ class AudioTranscriber:
         Returns:
             List of segments within the time range
         """
+        index = self._segment_index
+        if index is None or index[0] is not segments:
+            index = self._index_segments(segments)
+        _, starts, ends = index
+        
+        # Segments are time-ordered, so binary search narrows the window
+        lo = int(np.searchsorted(starts, start_time, side='left'))
+        hi = int(np.searchsorted(ends, end_time, side='right'))
+        
+        # Filter the boundary in case end times are not strictly monotonic
         return [
-            seg for seg in segments 
-            if seg['start'] >= start_time and seg['end'] <= end_time
+            seg for seg in segments[lo:hi]
+            if seg.start >= start_time and seg.end <= end_time
         ]
+    
+    def _index_segments(self, segments: List[Segment]) -> Tuple[List[Segment], np.ndarray, np.ndarray]:
+        """Cache segment start/end times as arrays for range queries."""
+        index = (
+            segments,
+            np.array([seg.start for seg in segments], dtype=np.float64),
+            np.array([seg.end for seg in segments], dtype=np.float64),
+        )
+        self._segment_index = index
+        return index
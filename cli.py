@@ -5,9 +5,12 @@ Process videos from the command line without starting the server.
 """
 
 import argparse
+import logging
 import sys
 from orchestrator import ClipOrchestrator
-from config import settings
+from config import settings, configure_logging
+
+log = logging.getLogger(__name__)
 
 
 def main():
@@ -40,6 +43,18 @@ def main():
         help="Don't add cinematic zoom effects"
     )
     
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Don't reuse cached AI analysis from previous runs"
+    )
+    
+    parser.add_argument(
+        "-q", "--quiet",
+        action="store_true",
+        help="Only show warnings and errors"
+    )
+    
     parser.add_argument(
         "--output-dir",
         default=None,
@@ -48,27 +63,29 @@ def main():
     
     args = parser.parse_args()
     
+    configure_logging("WARNING" if args.quiet else None)
+    
     # Check if Gemini API key is set
     if not settings.gemini_api_key:
-        print("ERROR: GEMINI_API_KEY not set!")
-        print("Please set it in .env file or environment variables.")
-        print("Get a free API key from: https://makersuite.google.com/app/apikey")
+        log.error("ERROR: GEMINI_API_KEY not set!")
+        log.error("Please set it in .env file or environment variables.")
+        log.error("Get a free API key from: https://makersuite.google.com/app/apikey")
         sys.exit(1)
     
     # Initialize orchestrator
-    print("Initializing Short Clips AI...")
-    orchestrator = ClipOrchestrator()
+    log.info("Initializing Short Clips AI...")
+    orchestrator = ClipOrchestrator(use_cache=not args.no_cache)
     
     # Determine if video is URL or local file
     import os
     is_local = os.path.isfile(args.video)
     
-    print(f"\nProcessing {'local video' if is_local else 'video from URL'}...")
-    print(f"Video: {args.video}")
-    print(f"Generating {args.num_clips} clips")
-    print(f"Background music: {'No' if args.no_music else 'Yes'}")
-    print(f"Cinematic zoom: {'No' if args.no_zoom else 'Yes'}")
-    print()
+    log.info("\nProcessing %s...", "local video" if is_local else "video from URL")
+    log.info("Video: %s", args.video)
+    log.info("Generating %d clips", args.num_clips)
+    log.info("Background music: %s", "No" if args.no_music else "Yes")
+    log.info("Cinematic zoom: %s", "No" if args.no_zoom else "Yes")
+    log.info("")
     
     try:
         # Process video
@@ -87,7 +104,7 @@ def main():
                 add_zoom=not args.no_zoom
             )
         
-        # Display results
+        # Results go to stdout so --quiet only silences progress logging
         if results['success']:
             print("\n" + "="*60)
             print("✅ SUCCESS! Generated clips:")
@@ -111,19 +128,19 @@ def main():
                 print(results['analysis'][:500] + "..." if len(results['analysis']) > 500 else results['analysis'])
         
         else:
-            print("\n❌ ERROR: Failed to generate clips")
+            log.error("\n❌ ERROR: Failed to generate clips")
             if results['errors']:
-                print("Errors:")
+                log.error("Errors:")
                 for error in results['errors']:
-                    print(f"  - {error}")
+                    log.error("  - %s", error)
             sys.exit(1)
     
     except KeyboardInterrupt:
-        print("\n\n⚠️  Processing interrupted by user")
+        log.warning("\n\n⚠️  Processing interrupted by user")
         sys.exit(1)
     
     except Exception as e:
-        print(f"\n❌ ERROR: {str(e)}")
+        log.error("\n❌ ERROR: %s", e)
         sys.exit(1)
 
 
@@ -3,40 +3,159 @@ Configuration module for the Short Clips AI tool.
 Loads environment variables and provides application settings.
 """
 
+import atexit
+import functools
+import logging
+import logging.handlers
+import multiprocessing
 import os
+import sys
+from dataclasses import dataclass, field
+from typing import Optional
 from dotenv import load_dotenv
 
 load_dotenv()
 
 
+def _env(name: str, default: str):
+    """Default factory reading an environment variable at instantiation."""
+    return field(default_factory=lambda: os.getenv(name, default))
+
+
+def _env_int(name: str, default: str):
+    """Default factory reading an integer environment variable."""
+    return field(default_factory=lambda: int(os.getenv(name, default)))
+
+
+def _env_bool(name: str, default: str):
+    """Default factory reading a true/false environment variable."""
+    return field(default_factory=lambda: os.getenv(name, default).lower() == "true")
+
+
+@functools.lru_cache(maxsize=1)
+def _ensure_dirs(*directories: str):
+    """Create the working directories once per process."""
+    for directory in directories:
+        os.makedirs(directory, exist_ok=True)
+
+
+@dataclass(frozen=True)
 class Settings:
     """Application settings loaded from environment variables."""
-    
-    def __init__(self):
-        # API Keys
-        self.gemini_api_key = os.getenv("GEMINI_API_KEY", "")
-        self.freesound_api_key = os.getenv("FREESOUND_API_KEY", "")
-        
-        # Server Configuration
-        self.host = os.getenv("HOST", "0.0.0.0")
-        self.port = int(os.getenv("PORT", "8000"))
-        
-        # Video Processing Settings
-        self.min_clip_duration = int(os.getenv("MIN_CLIP_DURATION", "15"))
-        self.max_clip_duration = int(os.getenv("MAX_CLIP_DURATION", "60"))
-        self.target_aspect_ratio = os.getenv("TARGET_ASPECT_RATIO", "9:16")
-        self.output_resolution = os.getenv("OUTPUT_RESOLUTION", "1080x1920")
-        
-        # Directories
-        self.downloads_dir = "downloads"
-        self.outputs_dir = "outputs"
-        self.temp_dir = "temp"
-        self.models_dir = "models"
+
+    # API Keys
+    gemini_api_key: str = _env("GEMINI_API_KEY", "")
+    freesound_api_key: str = _env("FREESOUND_API_KEY", "")
+
+    # Server Configuration
+    host: str = _env("HOST", "0.0.0.0")
+    port: int = _env_int("PORT", "8000")
+    # Uvicorn worker processes; each has its own Whisper model and job table
+    workers: int = _env_int("WORKERS", "1")
+    # Auto-reload on code changes (development only, forces one worker)
+    reload: bool = _env_bool("RELOAD", "false")
+
+    # Video Processing Settings
+    min_clip_duration: int = _env_int("MIN_CLIP_DURATION", "15")
+    max_clip_duration: int = _env_int("MAX_CLIP_DURATION", "60")
+    target_aspect_ratio: str = _env("TARGET_ASPECT_RATIO", "9:16")
+    output_resolution: str = _env("OUTPUT_RESOLUTION", "1080x1920")
+
+    # Upper bound on clip render processes (also capped at the CPU count)
+    max_render_workers: int = _env_int("MAX_RENDER_WORKERS", "4")
+
+    # Processing jobs run at once per server process; others wait queued
+    max_concurrent_jobs: int = _env_int("MAX_CONCURRENT_JOBS", "2")
+
+    # Logging level for progress output (DEBUG, INFO, WARNING, ...)
+    log_level: str = _env("LOG_LEVEL", "INFO")
+
+    # Scene detection: frames skipped between analyzed frames, and whether
+    # to use the adaptive detector instead of a fixed content threshold
+    scene_frame_skip: int = _env_int("SCENE_FRAME_SKIP", "0")
+    scene_adaptive: bool = _env_bool("SCENE_ADAPTIVE", "false")
+
+    # Transcribe only candidate clip windows instead of the whole video
+    windowed_transcription: bool = _env_bool("WINDOWED_TRANSCRIPTION", "false")
+
+    # Directories
+    downloads_dir: str = "downloads"
+    outputs_dir: str = "outputs"
+    temp_dir: str = "temp"
+    models_dir: str = "models"
+
+    def __post_init__(self):
+        # Create necessary directories
+        _ensure_dirs(self.downloads_dir, self.outputs_dir,
+                     self.temp_dir, self.models_dir)
 
 
 settings = Settings()
 
-# Create necessary directories
-for directory in [settings.downloads_dir, settings.outputs_dir, 
-                  settings.temp_dir, settings.models_dir]:
-    os.makedirs(directory, exist_ok=True)
+# Queue drained by the logging listener; None until configure_logging runs
+_log_queue = None
+
+
+def get_mp_context():
+    """
+    Multiprocessing context for worker processes: forkserver, or spawn
+    where unavailable.
+    
+    The server already runs threads (request threadpool, log listener,
+    Whisper), and forking a threaded process can copy held locks. Queues
+    and other primitives handed to the workers must come from the same
+    context.
+    """
+    methods = multiprocessing.get_all_start_methods()
+    return multiprocessing.get_context(
+        "forkserver" if "forkserver" in methods else "spawn"
+    )
+
+
+def configure_logging(level: Optional[str] = None):
+    """
+    Send log records through a queue to a background listener thread.
+    
+    Emitting a record only enqueues it, so threads and render processes
+    never contend on the stderr lock. A multiprocessing queue is used so
+    worker processes can log to the same listener (see init_worker_logging).
+    Safe to call more than once; later calls only change the level.
+    
+    Args:
+        level: Logging level name, defaults to settings.log_level
+    """
+    global _log_queue
+    
+    root = logging.getLogger()
+    root.setLevel((level or settings.log_level).upper())
+    if _log_queue is not None:
+        return
+    
+    _log_queue = get_mp_context().Queue(-1)
+    handler = logging.StreamHandler(sys.stderr)
+    handler.setFormatter(logging.Formatter("%(message)s"))
+    listener = logging.handlers.QueueListener(_log_queue, handler)
+    listener.start()
+    atexit.register(listener.stop)
+    
+    root.handlers = [logging.handlers.QueueHandler(_log_queue)]
+
+
+def get_log_queue():
+    """Return the logging queue, or None if logging isn't configured."""
+    return _log_queue
+
+
+def init_worker_logging(queue, level: int):
+    """
+    Route a worker process's logging to the parent's listener.
+    
+    Args:
+        queue: Queue from get_log_queue() in the parent process
+        level: Root logger level of the parent process
+    """
+    if queue is None:
+        return
+    root = logging.getLogger()
+    root.handlers = [logging.handlers.QueueHandler(queue)]
+    root.setLevel(level)
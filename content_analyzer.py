@@ -1,23 +1,80 @@
 """
-AI content analyzer using Google Gemini Pro.
+AI content analyzer using Google Gemini.
 Identifies key moments and generates viral titles/captions.
 """
 
+import functools
+import hashlib
+import json
+import os
+import tempfile
+import time
+from itertools import islice
 import google.generativeai as genai
-from typing import List, Dict, Optional
+import tiktoken
+from typing import List, Dict, Optional, TYPE_CHECKING
 from config import settings
 
+if TYPE_CHECKING:
+    from audio_transcriber import Segment
+
+# Cap on transcript segments sent in a single prompt
+MAX_PROMPT_SEGMENTS = 2000
+
+# Cap on transcript tokens sent in a single prompt
+MAX_PROMPT_TOKENS = 20000
+
+# Segments with fewer words carry too little content to pick moments from
+MIN_SEGMENT_WORDS = 3
+
+# Cached Gemini responses expire after this many seconds, and only the
+# newest CACHE_MAX_ENTRIES are kept
+CACHE_TTL = 7 * 24 * 3600
+CACHE_MAX_ENTRIES = 500
+
+
+@functools.lru_cache(maxsize=1)
+def _get_encoding():
+    """Load the tokenizer used for prompt budgets, or None if unavailable."""
+    try:
+        return tiktoken.get_encoding("cl100k_base")
+    except Exception:
+        # The BPE file is downloaded on first use and may not be reachable
+        return None
+
+
+def _trim_to_token_budget(text: str, max_tokens: int = MAX_PROMPT_TOKENS) -> str:
+    """Truncate text to roughly max_tokens tokens."""
+    encoding = _get_encoding()
+    if encoding is None:
+        # Rough fallback of ~4 characters per token
+        return text[:max_tokens * 4]
+    
+    tokens = encoding.encode(text)
+    if len(tokens) <= max_tokens:
+        return text
+    return encoding.decode(tokens[:max_tokens])
+
 
 class ContentAnalyzer:
-    """Analyzes video content using Gemini Pro to find viral moments."""
+    """Analyzes video content using Gemini to find viral moments."""
     
-    def __init__(self):
-        """Initialize Gemini Pro API."""
+    def __init__(self, model_name: str = "gemini-1.5-flash", use_cache: bool = True):
+        """
+        Initialize Gemini API.
+        
+        Args:
+            model_name: Gemini model to use (flash is much lower latency than pro)
+            use_cache: Whether to reuse cached responses for identical prompts
+        """
         if not settings.gemini_api_key:
             raise ValueError("GEMINI_API_KEY not set in environment")
         
         genai.configure(api_key=settings.gemini_api_key)
-        self.model = genai.GenerativeModel('gemini-pro')
+        self.model_name = model_name
+        self.model = genai.GenerativeModel(model_name)
+        self.use_cache = use_cache
+        self.cache_dir = os.path.join(settings.temp_dir, "gemini_cache")
         
     def analyze_transcript(self, transcript: str, video_title: str = "") -> Dict:
         """
@@ -35,7 +92,7 @@ class ContentAnalyzer:
 Video Title: {video_title}
 
 Transcript:
-{transcript}
+{_trim_to_token_budget(transcript)}
 
 Please provide:
 1. Top 3-5 key moments that would make great short clips (with approximate timestamp references if mentioned)
@@ -46,9 +103,8 @@ Please provide:
 Format your response as structured data that can be parsed."""
 
         try:
-            response = self.model.generate_content(prompt)
             return {
-                'analysis': response.text,
+                'analysis': self._cached_generate(prompt),
                 'success': True,
             }
         except Exception as e:
@@ -58,48 +114,70 @@ Format your response as structured data that can be parsed."""
                 'error': str(e),
             }
     
-    def find_key_moments(self, segments: List[Dict], 
+    def find_key_moments(self, segments: List['Segment'], 
                          min_duration: int = 15,
-                         max_duration: int = 60) -> List[Dict]:
+                         max_duration: int = 60,
+                         max_clips: int = 5) -> Dict:
         """
-        Find key moments in transcript segments based on content.
+        Find key moments in transcript segments, with a title and text hook
+        for each, in a single Gemini request.
         
         Args:
             segments: List of transcript segments with timestamps
             min_duration: Minimum clip duration
             max_duration: Maximum clip duration
+            max_clips: Maximum number of moments to return
             
         Returns:
-            List of suggested clip segments
+            Dictionary with a list of clips (start, end, title, hook, why)
         """
-        # Combine segments into chunks
-        full_text = " ".join([seg['text'] for seg in segments])
+        # Drop filler segments ("Yeah.", "Okay so") that only cost tokens
+        segments = [seg for seg in segments if len(seg.text.split()) >= MIN_SEGMENT_WORDS]
         
-        prompt = f"""Given this video transcript, identify the exact time ranges for the top 3-5 most engaging moments suitable for 15-60 second clips.
+        prompt = f"""Given this video transcript, identify the exact time ranges for the top {max_clips} most engaging moments suitable for {min_duration}-{max_duration} second clips.
 
 Transcript with timestamps:
-{self._format_segments(segments)}
+{_trim_to_token_budget(self._format_segments(segments))}
 
 For each key moment, provide:
-1. Start time (in seconds)
-2. End time (in seconds) - ensure duration is between {min_duration} and {max_duration} seconds
-3. Brief description of why this moment is engaging
-4. Suggested viral title
-5. Text hook (3-5 words for overlay)
+- start: start time in seconds
+- end: end time in seconds (duration must be between {min_duration} and {max_duration} seconds)
+- title: viral, curiosity-inducing title under 60 characters
+- hook: text hook of 3-5 words for the first 3 seconds overlay
+- why: brief description of why this moment is engaging
 
-Respond in a structured format."""
+Respond with JSON only, in this shape:
+{{"clips": [{{"start": 0.0, "end": 0.0, "title": "", "hook": "", "why": ""}}]}}"""
 
         try:
-            response = self.model.generate_content(prompt)
+            data = self._parse_json(self._cached_generate(
+                prompt,
+                generation_config={"response_mime_type": "application/json"}
+            ))
+            
+            clips = []
+            for clip in data.get('clips', []):
+                try:
+                    start, end = float(clip['start']), float(clip['end'])
+                except (KeyError, TypeError, ValueError):
+                    continue
+                if end <= start:
+                    continue
+                clips.append({
+                    'start': start,
+                    'end': end,
+                    'title': str(clip.get('title', '')).strip(),
+                    'hook': str(clip.get('hook', '')).strip(),
+                    'why': str(clip.get('why', '')).strip(),
+                })
             
-            # Parse response (simplified - in production, use more robust parsing)
             return {
-                'suggestions': response.text,
+                'clips': clips[:max_clips],
                 'success': True,
             }
         except Exception as e:
             return {
-                'suggestions': '',
+                'clips': [],
                 'success': False,
                 'error': str(e),
             }
@@ -108,6 +186,9 @@ Respond in a structured format."""
         """
         Generate a viral title for a clip.
         
+        Prefer the titles returned by find_key_moments or
+        generate_hooks_and_titles_batch; this costs a request per clip.
+        
         Args:
             clip_context: Context/content of the clip
             
@@ -127,8 +208,7 @@ Make them:
 Provide 3 options, one per line."""
 
         try:
-            response = self.model.generate_content(prompt)
-            return response.text
+            return self._cached_generate(prompt)
         except Exception as e:
             return "Amazing Video Clip"
     
@@ -136,6 +216,9 @@ Provide 3 options, one per line."""
         """
         Generate a text hook for the first 3 seconds of a clip.
         
+        Prefer the hooks returned by find_key_moments or
+        generate_hooks_and_titles_batch; this costs a request per clip.
+        
         Args:
             clip_context: Context/content of the clip
             
@@ -154,14 +237,138 @@ Make it:
 Provide only the hook text, nothing else."""
 
         try:
-            response = self.model.generate_content(prompt)
-            return response.text.strip()
+            return self._cached_generate(prompt).strip()
         except Exception as e:
             return "Watch this..."
     
-    def _format_segments(self, segments: List[Dict]) -> str:
+    def generate_hooks_and_titles_batch(self, clip_texts: List[str]) -> List[Dict]:
+        """
+        Generate a title and text hook for several clips in one request.
+        
+        Args:
+            clip_texts: Transcript text of each clip
+            
+        Returns:
+            One dictionary (title, hook) per clip, in the same order
+        """
+        fallback = {'title': "Amazing Video Clip", 'hook': "Watch this..."}
+        if not clip_texts:
+            return []
+        
+        snippets = "\n\n".join(
+            f"Snippet {i+1}:\n{_trim_to_token_budget(text, MAX_PROMPT_TOKENS // len(clip_texts))}"
+            for i, text in enumerate(clip_texts)
+        )
+        prompt = f"""For each of the following {len(clip_texts)} transcript snippets from short-form video clips, write:
+- title: viral, curiosity-inducing title under 60 characters
+- hook: ultra-short text hook of 3-7 words for the first 3 seconds overlay
+
+{snippets}
+
+Respond with JSON only: an array with one object per snippet, in order, in this shape:
+[{{"title": "", "hook": ""}}]"""
+
+        try:
+            data = self._parse_json(self._cached_generate(
+                prompt,
+                generation_config={"response_mime_type": "application/json"}
+            ))
+            if isinstance(data, dict):
+                data = next((v for v in data.values() if isinstance(v, list)), [])
+        except Exception:
+            data = []
+        
+        results = []
+        for i in range(len(clip_texts)):
+            item = data[i] if i < len(data) and isinstance(data[i], dict) else {}
+            results.append({
+                'title': str(item.get('title') or fallback['title']).strip(),
+                'hook': str(item.get('hook') or fallback['hook']).strip(),
+            })
+        return results
+    
+    def _cached_generate(self, prompt: str,
+                         generation_config: Optional[Dict] = None) -> str:
+        """
+        Generate content, reusing a cached response for an identical request.
+        
+        Args:
+            prompt: Prompt to send to Gemini
+            generation_config: Optional Gemini generation config
+            
+        Returns:
+            Response text
+        """
+        if not self.use_cache:
+            return self.model.generate_content(
+                prompt, generation_config=generation_config
+            ).text
+        
+        key = json.dumps([self.model_name, prompt, generation_config], sort_keys=True)
+        digest = hashlib.sha256(key.encode("utf-8")).hexdigest()
+        cache_path = os.path.join(self.cache_dir, f"{digest}.json")
+        
+        try:
+            if time.time() - os.path.getmtime(cache_path) < CACHE_TTL:
+                with open(cache_path, "r", encoding="utf-8") as f:
+                    return json.load(f)["text"]
+        except (OSError, ValueError, KeyError):
+            pass
+        
+        text = self.model.generate_content(
+            prompt, generation_config=generation_config
+        ).text
+        
+        try:
+            self._store_in_cache(cache_path, text)
+        except OSError:
+            # Caching is best effort; the response is still good
+            pass
+        
+        return text
+    
+    def _store_in_cache(self, cache_path: str, text: str):
+        """
+        Write a response to the cache and drop the oldest entries.
+        
+        The file is written under a temporary name and renamed into place,
+        so concurrent readers never see a partial response.
+        """
+        os.makedirs(self.cache_dir, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump({"text": text}, f)
+            os.replace(tmp_path, cache_path)
+        except BaseException:
+            os.remove(tmp_path)
+            raise
+        
+        with os.scandir(self.cache_dir) as entries:
+            cached = [
+                (entry.stat().st_mtime, entry.path)
+                for entry in entries if entry.name.endswith(".json")
+            ]
+        if len(cached) > CACHE_MAX_ENTRIES:
+            cached.sort()
+            for _, path in cached[:len(cached) - CACHE_MAX_ENTRIES]:
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+    
+    def _parse_json(self, text: str) -> Dict:
+        """Parse a JSON response, tolerating markdown code fences."""
+        text = text.strip()
+        if text.startswith("```"):
+            text = text.strip("`")
+            if text.startswith("json"):
+                text = text[len("json"):]
+        return json.loads(text)
+    
+    def _format_segments(self, segments: List['Segment']) -> str:
         """Format segments with timestamps for prompt."""
-        formatted = []
-        for seg in segments:
-            formatted.append(f"[{seg['start']:.1f}s - {seg['end']:.1f}s] {seg['text']}")
-        return "\n".join(formatted)
+        return "\n".join(
+            f"[{seg.start:.1f}s - {seg.end:.1f}s] {seg.text}"
+            for seg in islice(segments, MAX_PROMPT_SEGMENTS)
+        )
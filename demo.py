@@ -4,25 +4,29 @@ Demo script to test the Short Clips AI functionality.
 This script demonstrates basic usage without needing API keys.
 """
 
+import logging
 import os
+import sys
+
+log = logging.getLogger(__name__)
 
 
 def print_banner():
     """Print welcome banner."""
-    print("=" * 70)
-    print(" " * 20 + "SHORT CLIPS AI DEMO")
-    print("=" * 70)
-    print()
+    log.info("=" * 70)
+    log.info(" " * 20 + "SHORT CLIPS AI DEMO")
+    log.info("=" * 70)
+    log.info("")
 
 
 def check_dependencies():
     """Check if required dependencies are installed."""
-    print("Checking dependencies...")
+    log.info("Checking dependencies...")
     
     dependencies = {
         "fastapi": "FastAPI",
         "yt_dlp": "yt-dlp",
-        "whisper": "OpenAI Whisper",
+        "faster_whisper": "faster-whisper",
         "scenedetect": "PySceneDetect",
         "moviepy": "MoviePy",
         "google.generativeai": "Google Generative AI",
@@ -33,25 +37,25 @@ def check_dependencies():
     for module, name in dependencies.items():
         try:
             __import__(module)
-            print(f"  ✓ {name}")
+            log.info(f"  ✓ {name}")
         except ImportError:
-            print(f"  ✗ {name} - MISSING")
+            log.info(f"  ✗ {name} - MISSING")
             missing.append(name)
     
     if missing:
-        print("\n⚠️  Missing dependencies:")
+        log.info("\n⚠️  Missing dependencies:")
         for dep in missing:
-            print(f"  - {dep}")
-        print("\nInstall with: pip install -r requirements.txt")
+            log.info(f"  - {dep}")
+        log.info("\nInstall with: pip install -r requirements.txt")
         return False
     
-    print("\n✓ All dependencies installed!\n")
+    log.info("\n✓ All dependencies installed!\n")
     return True
 
 
 def check_ffmpeg():
     """Check if FFmpeg is installed."""
-    print("Checking FFmpeg...")
+    log.info("Checking FFmpeg...")
     
     import subprocess
     try:
@@ -63,22 +67,22 @@ def check_ffmpeg():
         )
         if result.returncode == 0:
             version = result.stdout.split('\n')[0]
-            print(f"  ✓ {version}\n")
+            log.info(f"  ✓ {version}\n")
             return True
     except (FileNotFoundError, subprocess.TimeoutExpired):
         pass
     
-    print("  ✗ FFmpeg not found!")
-    print("\nPlease install FFmpeg:")
-    print("  Ubuntu/Debian: sudo apt install ffmpeg")
-    print("  macOS: brew install ffmpeg")
-    print("  Windows: Download from ffmpeg.org\n")
+    log.info("  ✗ FFmpeg not found!")
+    log.info("\nPlease install FFmpeg:")
+    log.info("  Ubuntu/Debian: sudo apt install ffmpeg")
+    log.info("  macOS: brew install ffmpeg")
+    log.info("  Windows: Download from ffmpeg.org\n")
     return False
 
 
 def check_config():
     """Check configuration."""
-    print("Checking configuration...")
+    log.info("Checking configuration...")
     
     from config import settings
     
@@ -86,54 +90,58 @@ def check_config():
     
     if not settings.gemini_api_key:
         issues.append("GEMINI_API_KEY not set")
-        print("  ⚠️  GEMINI_API_KEY not configured")
-        print("     Get free API key: https://makersuite.google.com/app/apikey")
+        log.info("  ⚠️  GEMINI_API_KEY not configured")
+        log.info("     Get free API key: https://makersuite.google.com/app/apikey")
     else:
-        print("  ✓ GEMINI_API_KEY configured")
+        log.info("  ✓ GEMINI_API_KEY configured")
     
     if not settings.freesound_api_key:
-        print("  ⚠️  FREESOUND_API_KEY not configured (optional)")
-        print("     Background music will be disabled")
-        print("     Get free API key: https://freesound.org/apiv2/apply/")
+        log.info("  ⚠️  FREESOUND_API_KEY not configured (optional)")
+        log.info("     Background music will be disabled")
+        log.info("     Get free API key: https://freesound.org/apiv2/apply/")
     else:
-        print("  ✓ FREESOUND_API_KEY configured")
+        log.info("  ✓ FREESOUND_API_KEY configured")
     
     # Check directories
     for dir_name in [settings.downloads_dir, settings.outputs_dir, 
                      settings.temp_dir, settings.models_dir]:
         if os.path.exists(dir_name):
-            print(f"  ✓ Directory '{dir_name}' exists")
+            log.info(f"  ✓ Directory '{dir_name}' exists")
         else:
-            print(f"  ⚠️  Directory '{dir_name}' will be created")
+            log.info(f"  ⚠️  Directory '{dir_name}' will be created")
     
-    print()
+    log.info("")
     return len(issues) == 0
 
 
 def show_usage():
     """Show usage examples."""
-    print("Usage Examples:")
-    print("=" * 70)
-    print()
-    print("1. CLI Usage:")
-    print("   python cli.py 'https://youtube.com/watch?v=...' -n 3")
-    print()
-    print("2. API Server:")
-    print("   python main.py")
-    print("   Then visit: http://localhost:8000/docs")
-    print()
-    print("3. Python Module:")
-    print("   from orchestrator import ClipOrchestrator")
-    print("   orchestrator = ClipOrchestrator()")
-    print("   results = orchestrator.process_video('https://...')")
-    print()
-    print("For more examples, see EXAMPLES.md")
-    print("=" * 70)
-    print()
+    log.info("Usage Examples:")
+    log.info("=" * 70)
+    log.info("")
+    log.info("1. CLI Usage:")
+    log.info("   python cli.py 'https://youtube.com/watch?v=...' -n 3")
+    log.info("")
+    log.info("2. API Server:")
+    log.info("   python main.py")
+    log.info("   Then visit: http://localhost:8000/docs")
+    log.info("   In production, run one worker per two physical cores:")
+    log.info("   WORKERS=$(( $(nproc) / 2 )) python main.py")
+    log.info("")
+    log.info("3. Python Module:")
+    log.info("   from orchestrator import ClipOrchestrator")
+    log.info("   orchestrator = ClipOrchestrator()")
+    log.info("   results = orchestrator.process_video('https://...')")
+    log.info("")
+    log.info("For more examples, see EXAMPLES.md")
+    log.info("=" * 70)
+    log.info("")
 
 
 def main():
     """Main demo function."""
+    logging.basicConfig(level=logging.INFO, format="%(message)s", stream=sys.stderr)
+    
     print_banner()
     
     # Check everything
@@ -142,23 +150,22 @@ def main():
     config_ok = check_config()
     
     if deps_ok and ffmpeg_ok:
-        print("✅ System is ready to process videos!")
-        print()
+        log.info("✅ System is ready to process videos!")
+        log.info("")
         
         if not config_ok:
-            print("⚠️  Note: Some API keys are missing.")
-            print("   You can still test with your own API keys.")
+            log.info("⚠️  Note: Some API keys are missing.")
+            log.info("   You can still test with your own API keys.")
         
-        print()
+        log.info("")
         show_usage()
     else:
-        print("❌ Please fix the issues above before running.")
-        print()
+        log.info("❌ Please fix the issues above before running.")
+        log.info("")
         return 1
     
     return 0
 
 
 if __name__ == "__main__":
-    import sys
     sys.exit(main())
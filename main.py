@@ -3,24 +3,49 @@ FastAPI application for the Short Clips AI tool.
 Provides REST API endpoints for video processing.
 """
 
-from fastapi import FastAPI, HTTPException, BackgroundTasks, UploadFile, File
-from fastapi.responses import JSONResponse, FileResponse
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from fastapi import (
+    FastAPI, HTTPException, UploadFile, File, Request, Depends, Query
+)
+from fastapi.responses import JSONResponse, FileResponse, ORJSONResponse
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel, HttpUrl
-from typing import Optional, List
+from pydantic import BaseModel, Field, HttpUrl
+from typing import Callable, Dict, Optional, List
+import asyncio
+import importlib.util
 import os
+import shutil
+import stat
+import time
+import uuid
+import cachetools.func
 import uvicorn
 from pathlib import Path
 from orchestrator import ClipOrchestrator
-from config import settings
+from config import settings, configure_logging
+
+# Uploads are copied to disk in chunks of this size
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+
+# Seconds a /clips listing is reused; writes also invalidate it
+CLIPS_CACHE_TTL = 30
 
+# Seconds a finished job's status and results are kept for polling
+JOB_TTL = 3600
 
-def safe_join_path(base_dir: str, filename: str) -> str:
+# Base directories resolved once; they don't change while the server runs
+_OUTPUTS_BASE = Path(settings.outputs_dir).resolve()
+_DOWNLOADS_BASE = Path(settings.downloads_dir).resolve()
+
+
+def safe_join_path(base: Path, filename: str) -> str:
     """
     Safely join paths and prevent directory traversal attacks.
     
     Args:
-        base_dir: Base directory path
+        base: Resolved absolute base directory
         filename: Filename to join
         
     Returns:
@@ -29,9 +54,6 @@ def safe_join_path(base_dir: str, filename: str) -> str:
     Raises:
         HTTPException: If path traversal is detected
     """
-    # Resolve the base directory to absolute path
-    base = Path(base_dir).resolve()
-    
     # Remove any path components and use only the filename
     safe_filename = os.path.basename(filename)
     
@@ -47,11 +69,45 @@ def safe_join_path(base_dir: str, filename: str) -> str:
     return str(full_path)
 
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Create the orchestrator and job executor once the server starts, not at
+    import time, and shut them down when it stops.
+    """
+    configure_logging()
+    app.state.orchestrator = ClipOrchestrator()
+    app.state.job_executor = ThreadPoolExecutor(
+        max_workers=max(1, settings.max_concurrent_jobs),
+        thread_name_prefix="job"
+    )
+    try:
+        yield
+    finally:
+        # Drop jobs still queued and let running ones finish
+        for future in list(_job_futures):
+            future.cancel()
+        app.state.job_executor.shutdown()
+        app.state.orchestrator.close()
+
+
+def get_orchestrator(request: Request) -> ClipOrchestrator:
+    """Return the orchestrator shared across requests."""
+    return request.app.state.orchestrator
+
+
+def get_job_executor(request: Request) -> ThreadPoolExecutor:
+    """Return the executor processing jobs run on."""
+    return request.app.state.job_executor
+
+
 # Initialize FastAPI app
 app = FastAPI(
     title="Short Clips AI",
     description="AI-powered tool to convert long videos into viral short clips",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=ORJSONResponse,
+    lifespan=lifespan
 )
 
 # Add CORS middleware
@@ -63,11 +119,18 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Initialize orchestrator
-orchestrator = ClipOrchestrator()
+# Orchestrator and job executor are created in lifespan()
+app.state.orchestrator = None
+app.state.job_executor = None
 
-# Store processing jobs
-processing_jobs = {}
+# Store processing jobs by job ID (per worker process); finished jobs are
+# dropped after JOB_TTL. With WORKERS > 1 a poll can land on a worker that
+# doesn't know the job; that needs sticky routing or moving this table to
+# a shared store such as Redis
+processing_jobs: Dict[str, dict] = {}
+
+# Futures of submitted jobs that haven't finished, cancelled on shutdown
+_job_futures = set()
 
 
 # Request models
@@ -77,6 +140,7 @@ class VideoProcessRequest(BaseModel):
     num_clips: int = 3
     add_music: bool = True
     add_zoom: bool = True
+    workers: int = Field(0, ge=0, le=settings.max_render_workers)
 
 
 class VideoInfoRequest(BaseModel):
@@ -103,6 +167,75 @@ class ProcessResponse(BaseModel):
     errors: List[str] = []
 
 
+class JobResponse(BaseModel):
+    """Response model for a queued processing job."""
+    job_id: str
+    status: str
+
+
+class JobStatus(BaseModel):
+    """Status and, once finished, results of a processing job."""
+    job_id: str
+    status: str
+    result: Optional[ProcessResponse] = None
+    error: Optional[str] = None
+
+
+def _create_job(job_id: Optional[str] = None) -> str:
+    """Register a new queued job and return its ID."""
+    _evict_finished_jobs()
+    job_id = job_id or uuid.uuid4().hex
+    processing_jobs[job_id] = {
+        "job_id": job_id,
+        "status": "queued",
+        "result": None,
+        "error": None,
+    }
+    return job_id
+
+
+def _evict_finished_jobs():
+    """Forget jobs that finished more than JOB_TTL seconds ago."""
+    cutoff = time.monotonic() - JOB_TTL
+    expired = [
+        job_id for job_id, job in processing_jobs.items()
+        if "finished_at" in job and job["finished_at"] < cutoff
+    ]
+    for job_id in expired:
+        del processing_jobs[job_id]
+
+
+def _submit_job(executor: ThreadPoolExecutor, job_id: str,
+                pipeline: Callable[..., Dict], **kwargs):
+    """Queue a pipeline on the job executor."""
+    future = executor.submit(_run_pipeline, job_id, pipeline, **kwargs)
+    _job_futures.add(future)
+    future.add_done_callback(_job_futures.discard)
+
+
+def _run_pipeline(job_id: str, pipeline: Callable[..., Dict], **kwargs):
+    """
+    Run a processing pipeline and record its outcome on the job.
+    
+    Runs on the job executor, so at most MAX_CONCURRENT_JOBS pipelines run
+    at once and Starlette's threadpool stays free for requests.
+    """
+    job = processing_jobs[job_id]
+    job["status"] = "processing"
+    
+    try:
+        result = pipeline(job_id=job_id, **kwargs)
+        job["result"] = result
+        job["status"] = "completed" if result.get("success") else "failed"
+    except Exception as e:
+        job["error"] = str(e)
+        job["status"] = "failed"
+    finally:
+        job["finished_at"] = time.monotonic()
+        # New clips may have been written
+        _scan_clips.cache_clear()
+
+
 @app.get("/")
 async def root():
     """Root endpoint with API information."""
@@ -113,8 +246,10 @@ async def root():
         "endpoints": {
             "POST /process": "Process a video URL",
             "POST /process-local": "Process a local video file",
+            "GET /jobs/{job_id}": "Get processing job status and results",
             "GET /video-info": "Get video information",
             "GET /clips/{clip_id}": "Download a generated clip",
+            "POST /warmup": "Load AI models ahead of the first request",
             "GET /health": "Health check"
         }
     }
@@ -130,17 +265,37 @@ async def health_check():
     }
 
 
-@app.post("/process", response_model=ProcessResponse)
-async def process_video(request: VideoProcessRequest, background_tasks: BackgroundTasks):
+@app.post("/warmup")
+def warmup(orchestrator: ClipOrchestrator = Depends(get_orchestrator)):
     """
-    Process a video URL and generate viral clips.
+    Eagerly load the Whisper model and start the render processes so the
+    first job doesn't pay for them.
+    
+    Returns:
+        Warmup status
+    """
+    try:
+        orchestrator.transcriber.model
+        orchestrator.check_render_pool()
+        return {"status": "ready"}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@app.post("/process", response_model=JobResponse, status_code=202)
+async def process_video(request: VideoProcessRequest,
+                        orchestrator: ClipOrchestrator = Depends(get_orchestrator),
+                        executor: ThreadPoolExecutor = Depends(get_job_executor)):
+    """
+    Queue a video URL for processing into viral clips.
     
     Args:
         request: Video processing request
-        background_tasks: FastAPI background tasks
+        orchestrator: Shared clip orchestrator
+        executor: Executor processing jobs run on
         
     Returns:
-        Processing results with generated clips
+        Job ID to poll at GET /jobs/{job_id}
     """
     try:
         # Validate Gemini API key
@@ -150,38 +305,49 @@ async def process_video(request: VideoProcessRequest, background_tasks: Backgrou
                 detail="GEMINI_API_KEY not configured. Please set it in .env file."
             )
         
-        # Process video
-        results = orchestrator.process_video(
+        # Process video in the background
+        job_id = _create_job()
+        _submit_job(
+            executor,
+            job_id,
+            orchestrator.process_video,
             video_url=str(request.video_url),
             num_clips=request.num_clips,
             add_music=request.add_music,
-            add_zoom=request.add_zoom
+            add_zoom=request.add_zoom,
+            workers=request.workers
         )
         
-        return results
+        return {"job_id": job_id, "status": "queued"}
         
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
-@app.post("/process-local")
+@app.post("/process-local", response_model=JobResponse, status_code=202)
 async def process_local_video(
     file: UploadFile = File(...),
     num_clips: int = 3,
     add_music: bool = True,
-    add_zoom: bool = True
+    add_zoom: bool = True,
+    workers: int = Query(0, ge=0, le=settings.max_render_workers),
+    orchestrator: ClipOrchestrator = Depends(get_orchestrator),
+    executor: ThreadPoolExecutor = Depends(get_job_executor)
 ):
     """
-    Process a locally uploaded video file.
+    Queue a locally uploaded video file for processing.
     
     Args:
         file: Uploaded video file
         num_clips: Number of clips to generate
         add_music: Whether to add background music
         add_zoom: Whether to add cinematic zoom effects
+        workers: Clips rendered in parallel (0 = shared render pool)
+        orchestrator: Shared clip orchestrator
+        executor: Executor processing jobs run on
         
     Returns:
-        Processing results with generated clips
+        Job ID to poll at GET /jobs/{job_id}
     """
     try:
         # Validate Gemini API key
@@ -191,50 +357,112 @@ async def process_local_video(
                 detail="GEMINI_API_KEY not configured. Please set it in .env file."
             )
         
-        # Save uploaded file
-        file_path = os.path.join(settings.downloads_dir, file.filename)
+        # Save uploaded file under its base name, prefixed with the job ID
+        # so uploads with the same name don't replace a file in use
+        filename = os.path.basename(file.filename or "")
+        if not filename:
+            raise HTTPException(status_code=400, detail="Missing file name")
+        job_id = uuid.uuid4().hex
+        file_path = safe_join_path(_DOWNLOADS_BASE, f"{job_id}_{filename}")
         
-        with open(file_path, "wb") as f:
-            content = await file.read()
-            f.write(content)
+        await run_in_threadpool(_save_upload, file.file, file_path)
         
-        # Process video
-        results = orchestrator.process_local_video(
+        # Process video in the background
+        _create_job(job_id)
+        _submit_job(
+            executor,
+            job_id,
+            orchestrator.process_local_video,
             video_path=file_path,
+            video_title=os.path.splitext(filename)[0],
             num_clips=num_clips,
             add_music=add_music,
-            add_zoom=add_zoom
+            add_zoom=add_zoom,
+            workers=workers
         )
         
-        return results
+        return {"job_id": job_id, "status": "queued"}
         
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
+def _save_upload(source, file_path: str):
+    """Copy an upload's spooled file to disk in fixed-size chunks."""
+    with open(file_path, "wb") as dest:
+        shutil.copyfileobj(source, dest, UPLOAD_CHUNK_SIZE)
+
+
+@app.get("/jobs/{job_id}", response_model=JobStatus)
+async def get_job(job_id: str):
+    """
+    Get the status of a processing job.
+    
+    Args:
+        job_id: ID returned by /process or /process-local
+        
+    Returns:
+        Job status, with results once it has finished
+    """
+    job = processing_jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    
+    return job
+
+
 @app.get("/video-info")
-async def get_video_info(video_url: str):
+async def get_video_info(video_url: str,
+                         orchestrator: ClipOrchestrator = Depends(get_orchestrator)):
     """
     Get information about a video without downloading it.
     
     Args:
         video_url: URL of the video
+        orchestrator: Shared clip orchestrator
         
     Returns:
         Video metadata
     """
     try:
-        info = orchestrator.downloader.get_video_info(video_url)
-        return info
+        return await _get_video_info_single_flight(orchestrator, video_url)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
+# Only touched from the event loop, so no thread locking is needed
+_video_info_locks: Dict[str, asyncio.Lock] = {}
+
+
+async def _get_video_info_single_flight(orchestrator: ClipOrchestrator,
+                                        video_url: str) -> dict:
+    """
+    Fetch video metadata, letting concurrent requests for a URL share one
+    yt-dlp fetch; later calls hit the downloader's cache.
+    
+    The fetch runs in the threadpool so it doesn't block the event loop.
+    """
+    lock = _video_info_locks.setdefault(video_url, asyncio.Lock())
+    try:
+        async with lock:
+            return await run_in_threadpool(
+                orchestrator.downloader.get_video_info, video_url
+            )
+    finally:
+        # A later request may have replaced the entry; leave its lock alone
+        if _video_info_locks.get(video_url) is lock:
+            del _video_info_locks[video_url]
+
+
 @app.get("/clips/{clip_name}")
-async def download_clip(clip_name: str):
+def download_clip(clip_name: str):
     """
     Download a generated clip.
     
+    Declared sync so path checks run in the threadpool, not the event loop.
+    
     Args:
         clip_name: Name of the clip file
         
@@ -242,27 +470,32 @@ async def download_clip(clip_name: str):
         Video file
     """
     # Use safe path joining to prevent directory traversal
-    clip_path = safe_join_path(settings.outputs_dir, clip_name)
+    clip_path = safe_join_path(_OUTPUTS_BASE, clip_name)
     
-    if not os.path.exists(clip_path):
+    try:
+        st = os.stat(clip_path)
+    except FileNotFoundError:
         raise HTTPException(status_code=404, detail="Clip not found")
     
     # Ensure it's a file and has correct extension
-    if not os.path.isfile(clip_path) or not clip_name.endswith('.mp4'):
+    if not stat.S_ISREG(st.st_mode) or not clip_name.endswith('.mp4'):
         raise HTTPException(status_code=400, detail="Invalid clip file")
     
     return FileResponse(
         clip_path,
         media_type="video/mp4",
-        filename=os.path.basename(clip_path)
+        filename=os.path.basename(clip_path),
+        stat_result=st
     )
 
 
 @app.get("/thumbnails/{thumbnail_name}")
-async def download_thumbnail(thumbnail_name: str):
+def download_thumbnail(thumbnail_name: str):
     """
     Download a generated thumbnail.
     
+    Declared sync so path checks run in the threadpool, not the event loop.
+    
     Args:
         thumbnail_name: Name of the thumbnail file
         
@@ -270,19 +503,22 @@ async def download_thumbnail(thumbnail_name: str):
         Image file
     """
     # Use safe path joining to prevent directory traversal
-    thumbnail_path = safe_join_path(settings.outputs_dir, thumbnail_name)
+    thumbnail_path = safe_join_path(_OUTPUTS_BASE, thumbnail_name)
     
-    if not os.path.exists(thumbnail_path):
+    try:
+        st = os.stat(thumbnail_path)
+    except FileNotFoundError:
         raise HTTPException(status_code=404, detail="Thumbnail not found")
     
     # Ensure it's a file and has correct extension
-    if not os.path.isfile(thumbnail_path) or not thumbnail_name.endswith('.jpg'):
+    if not stat.S_ISREG(st.st_mode) or not thumbnail_name.endswith('.jpg'):
         raise HTTPException(status_code=400, detail="Invalid thumbnail file")
     
     return FileResponse(
         thumbnail_path,
         media_type="image/jpeg",
-        filename=os.path.basename(thumbnail_path)
+        filename=os.path.basename(thumbnail_path),
+        stat_result=st
     )
 
 
@@ -298,19 +534,20 @@ async def delete_clip(clip_name: str):
         Success message
     """
     # Use safe path joining to prevent directory traversal
-    clip_path = safe_join_path(settings.outputs_dir, clip_name)
+    clip_path = safe_join_path(_OUTPUTS_BASE, clip_name)
     
     # Ensure it's a valid MP4 file
     if not clip_name.endswith('.mp4'):
         raise HTTPException(status_code=400, detail="Invalid clip name")
     
-    if os.path.exists(clip_path) and os.path.isfile(clip_path):
+    if os.path.isfile(clip_path):
         os.remove(clip_path)
+        _scan_clips.cache_clear()
         
         # Also remove thumbnail
         thumbnail_name = clip_name.replace(".mp4", "_thumb.jpg")
-        thumbnail_path = safe_join_path(settings.outputs_dir, thumbnail_name)
-        if os.path.exists(thumbnail_path) and os.path.isfile(thumbnail_path):
+        thumbnail_path = safe_join_path(_OUTPUTS_BASE, thumbnail_name)
+        if os.path.isfile(thumbnail_path):
             os.remove(thumbnail_path)
         
         return {"message": "Clip deleted successfully"}
@@ -327,32 +564,57 @@ async def list_clips():
         List of clip files
     """
     try:
-        clips = []
-        for filename in os.listdir(settings.outputs_dir):
-            if filename.endswith(".mp4"):
-                file_path = os.path.join(settings.outputs_dir, filename)
-                thumbnail_name = filename.replace(".mp4", "_thumb.jpg")
-                
-                clips.append({
-                    "name": filename,
-                    "size": os.path.getsize(file_path),
-                    "thumbnail": thumbnail_name if os.path.exists(
-                        os.path.join(settings.outputs_dir, thumbnail_name)
-                    ) else None,
-                })
-        
-        return {"clips": clips}
+        return {"clips": _scan_clips()}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@cachetools.func.ttl_cache(maxsize=1, ttl=CLIPS_CACHE_TTL)
+def _scan_clips() -> List[dict]:
+    """
+    Scan the outputs directory for clips.
+    
+    The result, including sizes and thumbnail names, is cached until a job
+    finishes, a clip is deleted, or CLIPS_CACHE_TTL expires.
+    """
+    # One directory pass; thumbnails are matched by name afterwards
+    videos = []
+    names = set()
+    with os.scandir(settings.outputs_dir) as entries:
+        for entry in entries:
+            names.add(entry.name)
+            if entry.name.endswith(".mp4") and entry.is_file():
+                videos.append((entry.name, entry.stat().st_size))
+    
+    clips = []
+    for name, size in videos:
+        thumbnail_name = name.replace(".mp4", "_thumb.jpg")
+        clips.append({
+            "name": name,
+            "size": size,
+            "thumbnail": thumbnail_name if thumbnail_name in names else None,
+        })
+    
+    return clips
+
+
 def start_server():
-    """Start the FastAPI server."""
+    """
+    Start the FastAPI server.
+    
+    Set WORKERS to run several worker processes (each loads its own Whisper
+    model) and RELOAD=true to auto-reload on code changes during development.
+    Reload only supports a single worker.
+    """
     uvicorn.run(
         "main:app",
         host=settings.host,
         port=settings.port,
-        reload=True
+        workers=1 if settings.reload else settings.workers,
+        reload=settings.reload,
+        # Installed with uvicorn[standard]; not available on Windows
+        loop="uvloop" if importlib.util.find_spec("uvloop") else "auto",
+        http="httptools" if importlib.util.find_spec("httptools") else "auto"
     )
 
 
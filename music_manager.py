@@ -2,11 +2,43 @@
 Music manager for adding copyright-free background music using Freesound API.
 """
 
+import logging
 import os
+import re
+import tempfile
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from typing import List, Dict, Optional
 from config import settings
 
+log = logging.getLogger(__name__)
+
+# (connect, read) timeouts in seconds for Freesound requests
+REQUEST_TIMEOUT = (3, 30)
+
+# Previews are streamed to disk in chunks of this size
+DOWNLOAD_CHUNK_SIZE = 64 * 1024
+
+
+def _discard_download(future: Future):
+    """Delete the file of a download that finished but wasn't used."""
+    if not future.cancelled() and future.exception() is None and future.result():
+        try:
+            os.remove(future.result())
+        except OSError:
+            pass
+
+
+def _remove_partial(path: str):
+    """Delete a partly written download, if any."""
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
 
 class MusicManager:
     """Manages copyright-free music from Freesound."""
@@ -15,6 +47,17 @@ class MusicManager:
         """Initialize Freesound API client."""
         self.api_key = settings.freesound_api_key
         self.base_url = "https://freesound.org/apiv2"
+        self.cache_dir = os.path.join(settings.temp_dir, "music_cache")
+        
+        # Keep-alive session so consecutive calls reuse the TLS connection
+        self.session = requests.Session()
+        self.session.mount("https://", HTTPAdapter(
+            pool_connections=4,
+            pool_maxsize=8,
+            max_retries=Retry(total=2, backoff_factor=0.2)
+        ))
+        if self.api_key:
+            self.session.headers["Authorization"] = f"Token {self.api_key}"
         
     def search_music(self, query: str = "background music", 
                      duration_range: tuple = (15, 120),
@@ -35,29 +78,36 @@ class MusicManager:
         
         params = {
             'query': query,
-            'token': self.api_key,
             'filter': f'duration:[{duration_range[0]} TO {duration_range[1]}]',
             'fields': 'id,name,duration,url,previews,license',
             'page_size': limit,
         }
         
         try:
-            response = requests.get(f"{self.base_url}/search/text/", params=params)
+            response = self.session.get(
+                f"{self.base_url}/search/text/",
+                params=params,
+                timeout=REQUEST_TIMEOUT
+            )
             response.raise_for_status()
             data = response.json()
             
             return data.get('results', [])
         except Exception as e:
-            print(f"Failed to search music: {str(e)}")
+            log.warning("Failed to search music: %s", e)
             return []
     
-    def download_music(self, sound_id: int, output_path: str) -> bool:
+    def download_music(self, sound_id: int, output_path: str,
+                       preview_url: Optional[str] = None,
+                       cancel: Optional[threading.Event] = None) -> bool:
         """
         Download music file from Freesound.
         
         Args:
             sound_id: Freesound sound ID
             output_path: Path to save the music file
+            preview_url: Preview URL if already known from search results
+            cancel: Event that stops the download and deletes the file
             
         Returns:
             True if successful, False otherwise
@@ -66,26 +116,34 @@ class MusicManager:
             return False
         
         try:
-            # Get sound details
-            response = requests.get(
-                f"{self.base_url}/sounds/{sound_id}/",
-                params={'token': self.api_key}
-            )
-            response.raise_for_status()
-            sound_data = response.json()
+            if not preview_url:
+                # Get sound details
+                response = self.session.get(
+                    f"{self.base_url}/sounds/{sound_id}/",
+                    timeout=REQUEST_TIMEOUT
+                )
+                response.raise_for_status()
+                sound_data = response.json()
+                preview_url = sound_data['previews']['preview-hq-mp3']
             
             # Download preview (high quality)
-            preview_url = sound_data['previews']['preview-hq-mp3']
-            
-            audio_response = requests.get(preview_url)
-            audio_response.raise_for_status()
-            
-            with open(output_path, 'wb') as f:
-                f.write(audio_response.content)
+            with self.session.get(preview_url, timeout=REQUEST_TIMEOUT,
+                                  stream=True) as audio_response:
+                audio_response.raise_for_status()
+                
+                with open(output_path, 'wb') as f:
+                    for chunk in audio_response.iter_content(DOWNLOAD_CHUNK_SIZE):
+                        if cancel is not None and cancel.is_set():
+                            break
+                        f.write(chunk)
             
+            if cancel is not None and cancel.is_set():
+                _remove_partial(output_path)
+                return False
             return True
         except Exception as e:
-            print(f"Failed to download music: {str(e)}")
+            log.warning("Failed to download music: %s", e)
+            _remove_partial(output_path)
             return False
     
     def get_default_music(self) -> Optional[str]:
@@ -95,21 +153,97 @@ class MusicManager:
         Returns:
             Path to downloaded music or None
         """
+        cache_path = self._cache_path("default")
+        if os.path.exists(cache_path):
+            return cache_path
+        
         # Search for upbeat background music
         tracks = self.search_music("upbeat instrumental", duration_range=(30, 180), limit=5)
         
         if not tracks:
             return None
         
-        # Download first suitable track
-        for track in tracks:
-            output_path = os.path.join(settings.temp_dir, f"music_{track['id']}.mp3")
+        music_path = self._download_first(tracks)
+        return self._store_in_cache(music_path, cache_path) if music_path else None
+    
+    def _cache_path(self, key: str) -> str:
+        """Path of the cached track for a mood/duration key."""
+        safe_key = re.sub(r"[^A-Za-z0-9_-]+", "-", key)
+        return os.path.join(self.cache_dir, f"{safe_key}.mp3")
+    
+    def _download_to_temp(self, track: Dict,
+                           cancel: Optional[threading.Event] = None) -> Optional[str]:
+        """
+        Download a track into a uniquely named file in the cache directory,
+        so concurrent jobs fetching the same track never share a file.
+        
+        Args:
+            track: Track from search_music
+            cancel: Event that stops the download and deletes the file
             
-            if self.download_music(track['id'], output_path):
-                return output_path
+        Returns:
+            Path to the downloaded file or None
+        """
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            fd, output_path = tempfile.mkstemp(dir=self.cache_dir, suffix=".part")
+            os.close(fd)
+        except OSError as e:
+            log.warning("Failed to download music: %s", e)
+            return None
         
+        preview_url = track.get('previews', {}).get('preview-hq-mp3')
+        if self.download_music(track['id'], output_path, preview_url, cancel):
+            return output_path
+        _remove_partial(output_path)
         return None
     
+    def _store_in_cache(self, music_path: str, cache_path: str) -> str:
+        """
+        Move a downloaded track into the cache and return its new path.
+        
+        The rename is atomic, so readers see either no entry or a whole file.
+        """
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            os.replace(music_path, cache_path)
+            return cache_path
+        except OSError as e:
+            log.warning("Failed to cache music: %s", e)
+            return music_path
+    
+    def _download_first(self, tracks: List[Dict]) -> Optional[str]:
+        """
+        Download candidate tracks concurrently and return the first that succeeds.
+        
+        Once one finishes, the other downloads are cancelled and their files
+        deleted, so a failing or slow track only costs its own time.
+        
+        Args:
+            tracks: Tracks from search_music
+            
+        Returns:
+            Path to downloaded music or None
+        """
+        cancel = threading.Event()
+        pool = ThreadPoolExecutor(max_workers=len(tracks))
+        futures = [pool.submit(self._download_to_temp, track, cancel) for track in tracks]
+        winner = None
+        try:
+            for future in as_completed(futures):
+                if future.result():
+                    winner = future
+                    return future.result()
+            return None
+        finally:
+            # Stop the other downloads; any that still completed are deleted
+            cancel.set()
+            for future in futures:
+                if future is not winner:
+                    future.cancel()
+                    future.add_done_callback(_discard_download)
+            pool.shutdown(wait=False)
+    
     def search_by_mood(self, mood: str = "upbeat", 
                        duration: int = 30) -> Optional[str]:
         """
@@ -122,6 +256,10 @@ class MusicManager:
         Returns:
             Path to downloaded music or None
         """
+        cache_path = self._cache_path(f"{mood}_{duration}")
+        if os.path.exists(cache_path):
+            return cache_path
+        
         query = f"{mood} instrumental music"
         tracks = self.search_music(
             query, 
@@ -134,8 +272,8 @@ class MusicManager:
         
         # Download first track
         if tracks:
-            output_path = os.path.join(settings.temp_dir, f"music_{tracks[0]['id']}.mp3")
-            if self.download_music(tracks[0]['id'], output_path):
-                return output_path
+            output_path = self._download_to_temp(tracks[0])
+            if output_path:
+                return self._store_in_cache(output_path, cache_path)
         
         return None
@@ -3,34 +3,74 @@ Main orchestrator for the video clip generation pipeline.
 Coordinates all components to create viral clips.
 """
 
+import logging
 import os
+import uuid
+from bisect import bisect_left, bisect_right
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, List, Optional
+import numpy as np
 from video_downloader import VideoDownloader
-from audio_transcriber import AudioTranscriber
+from audio_transcriber import AudioTranscriber, Segment
 from scene_detector import SceneDetector
 from content_analyzer import ContentAnalyzer
 from music_manager import MusicManager
-from video_processor import VideoProcessor
+from video_processor import VideoProcessor, new_render_pool
 from config import settings
 
+log = logging.getLogger(__name__)
+
 
 class ClipOrchestrator:
     """Orchestrates the entire clip creation pipeline."""
     
-    def __init__(self):
-        """Initialize all components."""
+    def __init__(self, use_cache: bool = True):
+        """
+        Initialize all components.
+        
+        Args:
+            use_cache: Whether to reuse cached AI responses between runs
+        """
         self.downloader = VideoDownloader()
         self.transcriber = AudioTranscriber(model_size="base")
-        self.scene_detector = SceneDetector()
-        self.content_analyzer = ContentAnalyzer()
+        self.scene_detector = SceneDetector(
+            frame_skip=settings.scene_frame_skip,
+            adaptive=settings.scene_adaptive
+        )
+        self.content_analyzer = ContentAnalyzer(use_cache=use_cache)
         self.music_manager = MusicManager()
         self.video_processor = VideoProcessor()
         
+        # Runs scene detection and the music download alongside transcription
+        self._executor = ThreadPoolExecutor(max_workers=2)
+        
+        # Clip renders are independent CPU-bound encodes, so they run in
+        # worker processes shared across jobs
+        self._render_workers = max(1, min(os.cpu_count() or 1,
+                                          settings.max_render_workers))
+        self._render_pool = new_render_pool(self._render_workers)
+        
+    def check_render_pool(self):
+        """
+        Start the render processes by running one trivial task on them.
+        
+        Raises whatever stops workers from starting or taking tasks, such
+        as a logging queue from a different multiprocessing context.
+        """
+        self._render_pool.submit(os.getpid).result()
+    
+    def close(self):
+        """Shut down the background thread and render process pools."""
+        self._executor.shutdown()
+        self._render_pool.shutdown()
+    
     def process_video(self, 
                       video_url: str,
                       num_clips: int = 3,
                       add_music: bool = True,
-                      add_zoom: bool = True) -> Dict:
+                      add_zoom: bool = True,
+                      workers: int = 0,
+                      job_id: Optional[str] = None) -> Dict:
         """
         Process a video URL and create viral clips.
         
@@ -39,6 +79,8 @@ class ClipOrchestrator:
             num_clips: Number of clips to generate
             add_music: Whether to add background music
             add_zoom: Whether to add cinematic zoom effects
+            workers: Clips rendered in parallel (0 = shared render pool)
+            job_id: Prefix for output file names (default: a random ID)
             
         Returns:
             Dictionary containing results and generated clips
@@ -51,89 +93,28 @@ class ClipOrchestrator:
         
         try:
             # Step 1: Download video
-            print("Step 1: Downloading video...")
+            log.info("Step 1: Downloading video...")
             download_info = self.downloader.download(video_url)
             video_path = download_info['filepath']
             video_title = download_info['title']
             
-            print(f"Downloaded: {video_title}")
-            
-            # Step 2: Transcribe audio
-            print("Step 2: Transcribing audio...")
-            transcript_data = self.transcriber.transcribe(video_path)
-            transcript = transcript_data['text']
-            segments = transcript_data['segments']
-            
-            print(f"Transcribed {len(segments)} segments")
-            
-            # Step 3: Detect scenes
-            print("Step 3: Detecting scenes...")
-            scenes = self.scene_detector.detect_scenes(video_path)
-            
-            print(f"Detected {len(scenes)} scenes")
-            
-            # Step 4: Analyze content with AI
-            print("Step 4: Analyzing content with AI...")
-            analysis = self.content_analyzer.analyze_transcript(transcript, video_title)
-            
-            print("AI analysis complete")
-            
-            # Step 5: Find key moments
-            print("Step 5: Finding key moments...")
-            clip_segments = self._find_best_segments(
-                scenes=scenes,
-                segments=segments,
-                num_clips=num_clips
+            log.info("Downloaded: %s", video_title)
+            
+            self._create_clips(
+                video_path=video_path,
+                video_title=video_title,
+                num_clips=num_clips,
+                add_music=add_music,
+                add_zoom=add_zoom,
+                results=results,
+                workers=workers,
+                job_id=job_id,
+                step=2
             )
             
-            print(f"Identified {len(clip_segments)} key moments")
-            
-            # Step 6: Get background music
-            music_path = None
-            if add_music and settings.freesound_api_key:
-                print("Step 6: Getting background music...")
-                music_path = self.music_manager.get_default_music()
-                if music_path:
-                    print(f"Music downloaded: {music_path}")
-            
-            # Step 7: Generate clips
-            print("Step 7: Generating clips...")
-            for i, segment in enumerate(clip_segments[:num_clips]):
-                print(f"Creating clip {i+1}/{num_clips}...")
-                
-                # Generate text hook using AI
-                clip_text = self._get_clip_text(segments, segment['start'], segment['end'])
-                text_hook = self.content_analyzer.generate_text_hook(clip_text)
-                
-                # Generate viral title
-                viral_title = self.content_analyzer.generate_viral_title(clip_text)
-                
-                # Create clip
-                clip_result = self.video_processor.create_clip(
-                    video_path=video_path,
-                    start_time=segment['start'],
-                    end_time=segment['end'],
-                    output_name=f"clip_{i+1}",
-                    text_hook=text_hook,
-                    add_zoom=add_zoom,
-                    music_path=music_path
-                )
-                
-                if clip_result['success']:
-                    clip_result['title'] = viral_title
-                    clip_result['text_hook'] = text_hook
-                    results['clips'].append(clip_result)
-                    print(f"Clip {i+1} created successfully")
-                else:
-                    results['errors'].append(clip_result.get('error', 'Unknown error'))
-            
-            results['success'] = len(results['clips']) > 0
-            results['original_title'] = video_title
-            results['analysis'] = analysis.get('analysis', '')
-            
             # Clean up
             if os.path.exists(video_path):
-                print("Cleaning up downloaded video...")
+                log.info("Cleaning up downloaded video...")
                 # Optionally remove downloaded video to save space
                 # os.remove(video_path)
             
@@ -143,10 +124,193 @@ class ClipOrchestrator:
             results['errors'].append(str(e))
             return results
     
+    def _create_clips(self,
+                      video_path: str,
+                      video_title: str,
+                      num_clips: int,
+                      add_music: bool,
+                      add_zoom: bool,
+                      results: Dict,
+                      workers: int = 0,
+                      job_id: Optional[str] = None,
+                      step: int = 1) -> Dict:
+        """
+        Run the analysis and clip generation steps shared by both entry points.
+        
+        Args:
+            video_path: Path to the source video
+            video_title: Title used for AI analysis
+            num_clips: Number of clips to generate
+            add_music: Whether to add background music
+            add_zoom: Whether to add cinematic zoom effects
+            results: Results dictionary to fill in
+            workers: Clips rendered in parallel (0 = shared render pool)
+            job_id: Prefix for output file names (default: a random ID)
+            step: Number of the first step, for progress output
+            
+        Returns:
+            The updated results dictionary
+        """
+        # Clips of concurrent jobs must not overwrite each other
+        job_id = job_id or uuid.uuid4().hex[:8]
+        
+        # Each job's own pool is bounded like the shared one
+        workers = max(0, min(workers, settings.max_render_workers))
+        
+        if settings.windowed_transcription:
+            # Detect scenes first and only transcribe the candidate clip
+            # windows; ASR cost is linear in audio length
+            log.info("Step %d: Detecting scenes...", step)
+            scenes = self.scene_detector.detect_scenes(video_path)
+            scenes_future = None
+            
+            log.info("Detected %d scenes", len(scenes))
+            step += 1
+            
+            candidates = self._find_best_segments(
+                scenes=scenes,
+                segments=[],
+                num_clips=num_clips
+            )
+            
+            log.info("Step %d: Transcribing %d candidate windows...", step, len(candidates))
+            transcript_data = self.transcriber.transcribe_windows(
+                video_path,
+                [(clip['start'], clip['end']) for clip in candidates]
+            )
+        else:
+            # Transcribe audio while scenes are detected in the background;
+            # both are CPU-bound in native code that releases the GIL
+            log.info("Step %d: Transcribing audio and detecting scenes...", step)
+            scenes_future = self._executor.submit(
+                self.scene_detector.detect_scenes, video_path
+            )
+            transcript_data = self.transcriber.transcribe(video_path)
+        
+        transcript = transcript_data['text']
+        segments = transcript_data['segments']
+        
+        # Clip text lookups binary-search the segment start times
+        starts = [seg.start for seg in segments]
+        if any(a > b for a, b in zip(starts, starts[1:])):
+            segments = sorted(segments, key=lambda seg: seg.start)
+            starts = [seg.start for seg in segments]
+        
+        log.info("Transcribed %d segments", len(segments))
+        step += 1
+        
+        # Analyze content with AI, overlapping the network round-trip
+        # with the remaining scene detection work
+        log.info("Step %d: Analyzing content with AI...", step)
+        analysis = self.content_analyzer.analyze_transcript(transcript, video_title)
+        
+        # One request returns clip ranges with their titles and hooks;
+        # with windowed transcription the ranges are already fixed
+        key_moments = {}
+        if scenes_future is not None:
+            key_moments = self.content_analyzer.find_key_moments(
+                segments,
+                min_duration=settings.min_clip_duration,
+                max_duration=settings.max_clip_duration,
+                max_clips=num_clips
+            )
+        
+        log.info("AI analysis complete")
+        
+        if scenes_future is not None:
+            scenes = scenes_future.result()
+            log.info("Detected %d scenes", len(scenes))
+        step += 1
+        
+        # Find key moments
+        log.info("Step %d: Finding key moments...", step)
+        clip_segments = self._find_best_segments(
+            scenes=scenes,
+            segments=segments,
+            num_clips=num_clips,
+            key_moments=key_moments.get('clips', [])
+        )
+        
+        log.info("Identified %d key moments", len(clip_segments))
+        step += 1
+        
+        # Fetch background music only once there are clips to put it on;
+        # the download overlaps with generating missing hooks and titles
+        music_future = None
+        if clip_segments and add_music and settings.freesound_api_key:
+            music_future = self._executor.submit(self.music_manager.get_default_music)
+        
+        # Generate clips
+        log.info("Step %d: Generating clips...", step)
+        clip_segments = clip_segments[:num_clips]
+        
+        # Use the AI-picked hooks and titles; generate the missing ones
+        # for all clips in a single request
+        missing = [
+            i for i, segment in enumerate(clip_segments)
+            if not segment.get('hook') or not segment.get('title')
+        ]
+        generated = {}
+        if missing:
+            clip_texts = [
+                self._get_clip_text(segments, starts,
+                                    clip_segments[i]['start'], clip_segments[i]['end'])
+                for i in missing
+            ]
+            generated = dict(zip(
+                missing,
+                self.content_analyzer.generate_hooks_and_titles_batch(clip_texts)
+            ))
+        
+        clip_jobs = []
+        for i, segment in enumerate(clip_segments):
+            meta = generated.get(i, {})
+            text_hook = segment.get('hook') or meta.get('hook')
+            viral_title = segment.get('title') or meta.get('title')
+            clip_jobs.append((i, segment, text_hook, viral_title))
+        
+        # Collect background music fetched in the background
+        music_path = music_future.result() if music_future else None
+        if music_path:
+            log.info("Music downloaded: %s", music_path)
+        
+        # Render clips in parallel; zoomed clips use the shared render
+        # processes unless the job asks for a worker count of its own
+        log.info("Rendering %d clips...", len(clip_jobs))
+        clip_results = self.video_processor.create_multiple_clips(
+            video_path,
+            [
+                {'start': segment['start'], 'end': segment['end'], 'text_hook': text_hook}
+                for _, segment, text_hook, _ in clip_jobs
+            ],
+            base_name=job_id,
+            workers=workers or self._render_workers,
+            pool=None if workers > 0 else self._render_pool,
+            add_zoom=add_zoom,
+            music_path=music_path
+        )
+        
+        # Results come back in clip order
+        for (i, _, text_hook, viral_title), clip_result in zip(clip_jobs, clip_results):
+            if clip_result['success']:
+                clip_result['title'] = viral_title
+                clip_result['text_hook'] = text_hook
+                results['clips'].append(clip_result)
+                log.info("Clip %d created successfully", i + 1)
+            else:
+                results['errors'].append(clip_result.get('error', 'Unknown error'))
+        
+        results['success'] = len(results['clips']) > 0
+        results['original_title'] = video_title
+        results['analysis'] = analysis.get('analysis', '')
+        
+        return results
+    
     def _find_best_segments(self, 
                             scenes: List[Dict],
-                            segments: List[Dict],
-                            num_clips: int = 3) -> List[Dict]:
+                            segments: List[Segment],
+                            num_clips: int = 3,
+                            key_moments: Optional[List[Dict]] = None) -> List[Dict]:
         """
         Find the best segments for clips based on scenes and transcript.
         
@@ -154,6 +318,7 @@ class ClipOrchestrator:
             scenes: Detected scene changes
             segments: Transcript segments
             num_clips: Number of clips to find
+            key_moments: AI-suggested moments, preferred over scene-based cuts
             
         Returns:
             List of segment dictionaries with start/end times
@@ -161,6 +326,28 @@ class ClipOrchestrator:
         min_duration = settings.min_clip_duration
         max_duration = settings.max_clip_duration
         
+        # Scene boundaries as contiguous arrays for vectorized snapping;
+        # kept local since the orchestrator is shared between jobs
+        scene_starts = np.fromiter((s['start'] for s in scenes), dtype=np.float64, count=len(scenes))
+        scene_ends = np.fromiter((s['end'] for s in scenes), dtype=np.float64, count=len(scenes))
+        
+        # Prefer AI-picked moments, snapped to nearby scene cuts
+        best_clips = []
+        for moment in key_moments or []:
+            start, end = self._adjust_to_scenes(moment['start'], moment['end'],
+                                                scene_starts, scene_ends)
+            if min_duration <= end - start <= max_duration:
+                best_clips.append({
+                    'start': start,
+                    'end': end,
+                    'duration': end - start,
+                    'title': moment.get('title'),
+                    'hook': moment.get('hook'),
+                })
+        
+        if len(best_clips) >= num_clips:
+            return best_clips[:num_clips]
+        
         # Get natural cut points from scene detection
         potential_clips = self.scene_detector.get_natural_cut_points(
             scenes, 
@@ -179,7 +366,7 @@ class ClipOrchestrator:
                 end = min(start + max_duration, total_duration)
                 
                 # Adjust to scene boundaries
-                start, end = self._adjust_to_scenes(start, end, scenes)
+                start, end = self._adjust_to_scenes(start, end, scene_starts, scene_ends)
                 
                 if end - start >= min_duration:
                     potential_clips.append({
@@ -188,34 +375,48 @@ class ClipOrchestrator:
                         'duration': end - start,
                     })
         
-        return potential_clips[:num_clips]
+        # Top up with scene-based segments that don't overlap AI picks
+        for clip in potential_clips:
+            if len(best_clips) >= num_clips:
+                break
+            if all(clip['end'] <= c['start'] or clip['start'] >= c['end']
+                   for c in best_clips):
+                best_clips.append(clip)
+        
+        return best_clips
     
-    def _adjust_to_scenes(self, start: float, end: float, 
-                          scenes: List[Dict]) -> tuple:
-        """Adjust segment boundaries to scene cuts."""
+    def _adjust_to_scenes(self, start: float, end: float,
+                          scene_starts: np.ndarray,
+                          scene_ends: np.ndarray) -> tuple:
+        """Adjust segment boundaries to scene cuts within 2 seconds."""
+        if not len(scene_starts):
+            return start, end
+        
         # Find nearest scene boundaries
-        for scene in scenes:
-            if abs(scene['start'] - start) < 2:
-                start = scene['start']
-            if abs(scene['end'] - end) < 2:
-                end = scene['end']
+        i = np.abs(scene_starts - start).argmin()
+        if abs(scene_starts[i] - start) < 2:
+            start = float(scene_starts[i])
+        j = np.abs(scene_ends - end).argmin()
+        if abs(scene_ends[j] - end) < 2:
+            end = float(scene_ends[j])
         
         return start, end
     
-    def _get_clip_text(self, segments: List[Dict], 
+    def _get_clip_text(self, segments: List[Segment], starts: List[float],
                        start: float, end: float) -> str:
-        """Get transcript text for a specific clip."""
-        clip_segments = [
-            seg for seg in segments
-            if seg['start'] >= start and seg['end'] <= end
-        ]
-        return " ".join([seg['text'] for seg in clip_segments])
+        """Get transcript text for a specific clip (segments sorted by start)."""
+        lo = bisect_left(starts, start)
+        hi = bisect_right(starts, end)
+        return " ".join([seg.text for seg in segments[lo:hi] if seg.end <= end])
     
     def process_local_video(self,
                             video_path: str,
                             num_clips: int = 3,
                             add_music: bool = True,
-                            add_zoom: bool = True) -> Dict:
+                            add_zoom: bool = True,
+                            workers: int = 0,
+                            job_id: Optional[str] = None,
+                            video_title: Optional[str] = None) -> Dict:
         """
         Process a local video file.
         
@@ -224,6 +425,9 @@ class ClipOrchestrator:
             num_clips: Number of clips to generate
             add_music: Whether to add background music
             add_zoom: Whether to add cinematic zoom effects
+            workers: Clips rendered in parallel (0 = shared render pool)
+            job_id: Prefix for output file names (default: a random ID)
+            video_title: Title for AI analysis (default: the file name)
             
         Returns:
             Dictionary containing results and generated clips
@@ -236,83 +440,21 @@ class ClipOrchestrator:
         
         try:
             # Get video title from filename
-            video_title = os.path.splitext(os.path.basename(video_path))[0]
-            
-            # Step 1: Transcribe audio
-            print("Step 1: Transcribing audio...")
-            transcript_data = self.transcriber.transcribe(video_path)
-            transcript = transcript_data['text']
-            segments = transcript_data['segments']
-            
-            print(f"Transcribed {len(segments)} segments")
-            
-            # Step 2: Detect scenes
-            print("Step 2: Detecting scenes...")
-            scenes = self.scene_detector.detect_scenes(video_path)
-            
-            print(f"Detected {len(scenes)} scenes")
-            
-            # Step 3: Analyze content with AI
-            print("Step 3: Analyzing content with AI...")
-            analysis = self.content_analyzer.analyze_transcript(transcript, video_title)
-            
-            print("AI analysis complete")
-            
-            # Step 4: Find key moments
-            print("Step 4: Finding key moments...")
-            clip_segments = self._find_best_segments(
-                scenes=scenes,
-                segments=segments,
-                num_clips=num_clips
+            if not video_title:
+                video_title = os.path.splitext(os.path.basename(video_path))[0]
+            
+            return self._create_clips(
+                video_path=video_path,
+                video_title=video_title,
+                num_clips=num_clips,
+                add_music=add_music,
+                add_zoom=add_zoom,
+                results=results,
+                workers=workers,
+                job_id=job_id,
+                step=1
             )
             
-            print(f"Identified {len(clip_segments)} key moments")
-            
-            # Step 5: Get background music
-            music_path = None
-            if add_music and settings.freesound_api_key:
-                print("Step 5: Getting background music...")
-                music_path = self.music_manager.get_default_music()
-                if music_path:
-                    print(f"Music downloaded: {music_path}")
-            
-            # Step 6: Generate clips
-            print("Step 6: Generating clips...")
-            for i, segment in enumerate(clip_segments[:num_clips]):
-                print(f"Creating clip {i+1}/{num_clips}...")
-                
-                # Generate text hook using AI
-                clip_text = self._get_clip_text(segments, segment['start'], segment['end'])
-                text_hook = self.content_analyzer.generate_text_hook(clip_text)
-                
-                # Generate viral title
-                viral_title = self.content_analyzer.generate_viral_title(clip_text)
-                
-                # Create clip
-                clip_result = self.video_processor.create_clip(
-                    video_path=video_path,
-                    start_time=segment['start'],
-                    end_time=segment['end'],
-                    output_name=f"clip_{i+1}",
-                    text_hook=text_hook,
-                    add_zoom=add_zoom,
-                    music_path=music_path
-                )
-                
-                if clip_result['success']:
-                    clip_result['title'] = viral_title
-                    clip_result['text_hook'] = text_hook
-                    results['clips'].append(clip_result)
-                    print(f"Clip {i+1} created successfully")
-                else:
-                    results['errors'].append(clip_result.get('error', 'Unknown error'))
-            
-            results['success'] = len(results['clips']) > 0
-            results['original_title'] = video_title
-            results['analysis'] = analysis.get('analysis', '')
-            
-            return results
-            
         except Exception as e:
             results['errors'].append(str(e))
             return results
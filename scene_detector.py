@@ -4,21 +4,118 @@ Detects scene changes and potential clip boundaries.
 """
 
 from scenedetect import open_video, SceneManager
-from scenedetect.detectors import ContentDetector
-from typing import List, Dict
+from scenedetect.detectors import AdaptiveDetector, ContentDetector
+from typing import List, Dict, Tuple
+import numpy as np
+
+try:
+    from numba import njit
+except ImportError:
+    # Plain Python fallback; same results, just not compiled
+    def njit(*args, **kwargs):
+        return lambda func: func
+
+
+# Tolerance for duration comparisons; differences of prefix sums round
+# differently from a running total (15.0 can come out as 14.999999...)
+DURATION_EPSILON = 1e-9
+
+
+@njit(cache=True)
+def _pack_scenes(starts, cum_durations, last_end, min_duration, max_duration):
+    """
+    Greedily pack consecutive scenes into clips of at most max_duration.
+    
+    Each clip's last scene is found by binary search on the prefix sums
+    of scene durations, so a call costs O(clips * log scenes) instead of
+    a pass over every scene.
+    
+    Args:
+        starts: Scene start times
+        cum_durations: Prefix sums of scene durations, with a leading 0
+        last_end: End time of the final scene
+        min_duration: Minimum clip duration in seconds
+        max_duration: Maximum clip duration in seconds
+    
+    Returns:
+        Arrays of clip starts, ends and durations
+    """
+    n = len(starts)
+    clip_starts = np.empty(n + 1)
+    clip_ends = np.empty(n + 1)
+    clip_durations = np.empty(n + 1)
+    count = 0
+    if n == 0:
+        return clip_starts[:0], clip_ends[:0], clip_durations[:0]
+    
+    first = 0
+    current_start = 0.0
+    opened = False
+    while True:
+        # Index of the first scene that would push the clip past max_duration
+        limit = cum_durations[first] + max_duration + DURATION_EPSILON
+        cut = np.searchsorted(cum_durations, limit, side='right') - 1
+        # A clip always keeps its first scene, even an overlong one (the
+        # very first clip starts empty, as the scene-by-scene loop did)
+        if cut <= first and opened:
+            cut = first + 1
+        opened = True
+        if cut >= n:
+            break
+        
+        duration = cum_durations[cut] - cum_durations[first]
+        if duration >= min_duration - DURATION_EPSILON:
+            clip_starts[count] = current_start
+            clip_ends[count] = starts[cut]
+            clip_durations[count] = duration
+            count += 1
+        first = cut
+        current_start = starts[cut]
+    
+    # Add remaining clip if it meets minimum duration
+    duration = cum_durations[n] - cum_durations[first]
+    if duration >= min_duration - DURATION_EPSILON:
+        clip_starts[count] = current_start
+        clip_ends[count] = last_end
+        clip_durations[count] = duration
+        count += 1
+    
+    return clip_starts[:count], clip_ends[:count], clip_durations[:count]
 
 
 class SceneDetector:
     """Detects scenes and cuts in videos."""
     
-    def __init__(self, threshold: float = 27.0):
+    def __init__(self, threshold: float = 27.0,
+                 frame_skip: int = 0,
+                 adaptive: bool = False,
+                 backend: str = "pyav",
+                 downscale: int = 0):
         """
         Initialize scene detector.
         
         Args:
             threshold: Content detection threshold (lower = more sensitive)
+            frame_skip: Frames skipped (grabbed but not decoded) after each
+                analyzed frame; trades cut accuracy for speed
+            adaptive: Use AdaptiveDetector, which handles fast camera motion
+                better than the fixed content threshold
+            backend: PySceneDetect video backend; falls back to OpenCV if
+                it can't open the file
+            downscale: Integer factor frames are shrunk by before detection
+                (0 = automatic, to roughly 256 pixels wide). The content
+                metric is a per-pixel average, so thresholds need no change
         """
         self.threshold = threshold
+        self.frame_skip = frame_skip
+        self.adaptive = adaptive
+        self.backend = backend
+        self.downscale = downscale
+        
+        # (scenes, starts, ends, cum_durations) for the last detected scene
+        # list; replaced as one tuple so concurrent jobs never see
+        # mismatched arrays
+        self._scene_arrays = None
         
     def detect_scenes(self, video_path: str) -> List[Dict]:
         """
@@ -32,16 +129,29 @@ class SceneDetector:
         """
         try:
             # Open video
-            video = open_video(video_path)
+            video = self._open_video(video_path)
             scene_manager = SceneManager()
             
+            # Detect on shrunken frames; cut positions barely depend on
+            # resolution and HSV conversion cost is per pixel
+            if self.downscale > 0:
+                scene_manager.auto_downscale = False
+                scene_manager.downscale = self.downscale
+            else:
+                scene_manager.auto_downscale = True
+            
             # Add content detector
-            scene_manager.add_detector(
-                ContentDetector(threshold=self.threshold)
-            )
+            if self.adaptive:
+                scene_manager.add_detector(AdaptiveDetector())
+            else:
+                scene_manager.add_detector(
+                    ContentDetector(threshold=self.threshold)
+                )
             
             # Detect scenes
-            scene_manager.detect_scenes(video)
+            scene_manager.detect_scenes(
+                video, frame_skip=self.frame_skip, show_progress=False
+            )
             scene_list = scene_manager.get_scene_list()
             
             # Convert to simple format
@@ -57,11 +167,32 @@ class SceneDetector:
                     'duration': end_time - start_time,
                 })
             
+            self._scene_arrays = (scenes,) + self._to_arrays(scenes)
+            
             return scenes
             
         except Exception as e:
             raise Exception(f"Failed to detect scenes: {str(e)}")
     
+    def _open_video(self, video_path: str):
+        """
+        Open a video with the configured backend, falling back to OpenCV.
+        
+        PyAV decodes with libavcodec's own frame threads and hands frames
+        over without OpenCV's extra copy.
+        """
+        if self.backend == "pyav":
+            try:
+                return open_video(video_path, backend="pyav", threading_mode="AUTO")
+            except Exception:
+                pass
+        elif self.backend != "opencv":
+            try:
+                return open_video(video_path, backend=self.backend)
+            except Exception:
+                pass
+        return open_video(video_path, backend="opencv")
+    
     def find_scenes_in_range(self, scenes: List[Dict], 
                              start_time: float, end_time: float) -> List[Dict]:
         """
@@ -75,10 +206,30 @@ class SceneDetector:
         Returns:
             List of scenes within the range
         """
-        return [
-            scene for scene in scenes
-            if (scene['start'] <= end_time and scene['end'] >= start_time)
-        ]
+        starts, ends, _ = self._arrays_for(scenes)
+        mask = (starts <= end_time) & (ends >= start_time)
+        return [scenes[i] for i in np.flatnonzero(mask)]
+    
+    def _arrays_for(self, scenes: List[Dict]) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Return the cached arrays if scenes is the last detected list."""
+        cached = self._scene_arrays
+        if cached is not None and cached[0] is scenes:
+            return cached[1:]
+        return self._to_arrays(scenes)
+    
+    def _to_arrays(self, scenes: List[Dict]) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Split scenes into contiguous float64 arrays.
+        
+        Returns:
+            Start times, end times, and prefix sums of durations with a
+            leading 0 (so cum[j] - cum[i] is the length of scenes i..j-1)
+        """
+        starts = np.fromiter((s['start'] for s in scenes), dtype=np.float64, count=len(scenes))
+        ends = np.fromiter((s['end'] for s in scenes), dtype=np.float64, count=len(scenes))
+        durations = np.fromiter((s['duration'] for s in scenes), dtype=np.float64, count=len(scenes))
+        cum_durations = np.concatenate((np.zeros(1), np.cumsum(durations)))
+        return starts, ends, cum_durations
     
     def get_natural_cut_points(self, scenes: List[Dict], 
                                 min_duration: float = 15,
@@ -86,6 +237,9 @@ class SceneDetector:
         """
         Get natural cut points for creating clips based on scene boundaries.
         
+        Prefix sums for the last detected scene list are cached, so
+        sweeping several duration ranges over it is cheap.
+        
         Args:
             scenes: List of detected scenes
             min_duration: Minimum clip duration in seconds
@@ -94,32 +248,16 @@ class SceneDetector:
         Returns:
             List of potential clip segments
         """
-        clips = []
-        current_start = 0
-        current_duration = 0
+        if not scenes:
+            return []
         
-        for scene in scenes:
-            scene_duration = scene['duration']
-            
-            # If adding this scene exceeds max duration, create a clip
-            if current_duration + scene_duration > max_duration:
-                if current_duration >= min_duration:
-                    clips.append({
-                        'start': current_start,
-                        'end': scene['start'],
-                        'duration': current_duration,
-                    })
-                current_start = scene['start']
-                current_duration = scene_duration
-            else:
-                current_duration += scene_duration
-        
-        # Add remaining clip if it meets minimum duration
-        if current_duration >= min_duration and scenes:
-            clips.append({
-                'start': current_start,
-                'end': scenes[-1]['end'],
-                'duration': current_duration,
-            })
+        starts, _, cum_durations = self._arrays_for(scenes)
+        clip_starts, clip_ends, clip_durations = _pack_scenes(
+            starts, cum_durations, float(scenes[-1]['end']),
+            float(min_duration), float(max_duration)
+        )
         
-        return clips
+        return [
+            {'start': float(start), 'end': float(end), 'duration': float(duration)}
+            for start, end, duration in zip(clip_starts, clip_ends, clip_durations)
+        ]
@@ -4,10 +4,16 @@ Downloads videos from YouTube and other platforms.
 """
 
 import os
+import shutil
+import threading
+import cachetools
 import yt_dlp
 from typing import Dict, Optional
 from config import settings
 
+# Seconds video metadata is reused for the same URL
+INFO_CACHE_TTL = 3600
+
 
 class VideoDownloader:
     """Downloads videos using yt-dlp."""
@@ -15,6 +21,10 @@ class VideoDownloader:
     def __init__(self):
         self.download_dir = settings.downloads_dir
         
+        # Metadata by URL; the lock makes the cache safe across threads
+        self._info_cache = cachetools.TTLCache(maxsize=128, ttl=INFO_CACHE_TTL)
+        self._info_lock = threading.Lock()
+        
     def download(self, url: str, output_filename: Optional[str] = None) -> Dict[str, str]:
         """
         Download video from URL.
@@ -38,8 +48,22 @@ class VideoDownloader:
             'no_warnings': False,
             'extract_flat': False,
             'merge_output_format': 'mp4',
+            # Larger reads and parallel DASH/HLS fragments for throughput
+            'http_chunk_size': 10 * 1024 * 1024,
+            'concurrent_fragment_downloads': 8,
+            'buffersize': 1024 * 1024,
+            'retries': 10,
+            'fragment_retries': 10,
+            'socket_timeout': 30,
         }
         
+        # aria2c splits plain HTTP downloads over several connections
+        if shutil.which('aria2c'):
+            ydl_opts['external_downloader'] = {'default': 'aria2c'}
+            ydl_opts['external_downloader_args'] = {
+                'aria2c': ['-x', '16', '-s', '16', '-k', '1M'],
+            }
+        
         try:
             with yt_dlp.YoutubeDL(ydl_opts) as ydl:
                 info = ydl.extract_info(url, download=True)
@@ -61,7 +85,23 @@ class VideoDownloader:
             raise Exception(f"Failed to download video: {str(e)}")
     
     def get_video_info(self, url: str) -> Dict:
-        """Get video information without downloading."""
+        """
+        Get video information without downloading.
+        
+        Results are cached per URL for INFO_CACHE_TTL seconds; callers get
+        a copy they are free to modify.
+        """
+        with self._info_lock:
+            info = self._info_cache.get(url)
+        if info is None:
+            info = self._fetch_video_info(url)
+            with self._info_lock:
+                self._info_cache[url] = info
+        
+        return dict(info)
+    
+    def _fetch_video_info(self, url: str) -> Dict:
+        """Fetch video information from the site with yt-dlp."""
         ydl_opts = {
             'quiet': True,
             'no_warnings': True,
@@ -3,16 +3,175 @@ Video processor using MoviePy and FFmpeg.
 Creates viral clips with effects, text overlays, and music.
 """
 
+import functools
+import json
+import logging
 import os
+import shutil
+import subprocess
+import tempfile
+import textwrap
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from typing import Dict, List, Optional, Tuple
 from moviepy.editor import (
-    VideoFileClip, TextClip, CompositeVideoClip, 
-    AudioFileClip, concatenate_videoclips
+    VideoFileClip, CompositeVideoClip, 
+    AudioFileClip
 )
 from moviepy.video.fx import all as vfx
+from moviepy.audio.AudioClip import AudioArrayClip
 from PIL import Image, ImageDraw, ImageFont
 import numpy as np
-from config import settings
+from config import settings, get_log_queue, get_mp_context, init_worker_logging
+
+try:
+    import cv2
+except ImportError:
+    cv2 = None
+
+try:
+    from numba import njit, prange
+    HAVE_NUMBA = True
+except ImportError:
+    HAVE_NUMBA = False
+    prange = range
+    
+    def njit(*args, **kwargs):
+        return lambda func: func
+
+log = logging.getLogger(__name__)
+
+# Frame rate and size of rendered clips (9:16 vertical)
+OUTPUT_FPS = 30
+TARGET_WIDTH = 1080
+TARGET_HEIGHT = 1920
+
+# Sample rate audio is mixed at
+AUDIO_FPS = 44100
+
+# Bold fonts tried for text overlays, in order (PIL searches system font dirs)
+OVERLAY_FONTS = ["Arial Bold.ttf", "arialbd.ttf", "DejaVuSans-Bold.ttf",
+                 "LiberationSans-Bold.ttf"]
+
+
+# Fixed-point precision of the bilinear weights, as in cv2.INTER_LINEAR
+BILINEAR_BITS = 11
+
+
+@njit(parallel=True, fastmath=True, cache=True, nogil=True)
+def _bilinear_crop_zoom(frame, out, crop_y0, crop_x0, crop_h, crop_w):
+    """
+    Bilinearly resize a crop window of an HxWxC uint8 frame into out.
+    
+    Used for the zoom effect when OpenCV isn't installed; sampling follows
+    OpenCV's pixel-center convention and its fixed-point weights, so pixels
+    stay integers throughout and results match cv2.INTER_LINEAR.
+    """
+    out_h, out_w, channels = out.shape
+    scale_y = crop_h / out_h
+    scale_x = crop_w / out_w
+    one = 1 << BILINEAR_BITS
+    half = 1 << (2 * BILINEAR_BITS - 1)
+    
+    # Source columns and weights are the same for every row
+    x0s = np.empty(out_w, dtype=np.int64)
+    x1s = np.empty(out_w, dtype=np.int64)
+    wxs = np.empty(out_w, dtype=np.int64)
+    for j in range(out_w):
+        sx = min(max((j + 0.5) * scale_x - 0.5, 0.0), crop_w - 1.0)
+        x0 = int(sx)
+        x0s[j] = crop_x0 + x0
+        x1s[j] = crop_x0 + min(x0 + 1, crop_w - 1)
+        wxs[j] = int((sx - x0) * one + 0.5)
+    
+    for i in prange(out_h):
+        sy = min(max((i + 0.5) * scale_y - 0.5, 0.0), crop_h - 1.0)
+        y0 = int(sy)
+        y1 = crop_y0 + min(y0 + 1, crop_h - 1)
+        wy = int((sy - y0) * one + 0.5)
+        y0 += crop_y0
+        
+        for j in range(out_w):
+            x0 = x0s[j]
+            x1 = x1s[j]
+            wx = wxs[j]
+            for c in range(channels):
+                top = (np.int64(frame[y0, x0, c]) * (one - wx)
+                       + np.int64(frame[y0, x1, c]) * wx)
+                bottom = (np.int64(frame[y1, x0, c]) * (one - wx)
+                          + np.int64(frame[y1, x1, c]) * wx)
+                out[i, j, c] = np.uint8(
+                    (top * (one - wy) + bottom * wy + half) >> (2 * BILINEAR_BITS)
+                )
+    
+    return out
+
+
+@functools.lru_cache(maxsize=2)
+def _load_music(music_path: str, mtime: float) -> np.ndarray:
+    """
+    Decode a music file to PCM samples at AUDIO_FPS, once per process.
+    
+    Clips in a batch share one track, so only the first MoviePy render
+    decodes it. mtime is part of the key so a replaced file is reloaded.
+    The array is shared between callers and is read-only.
+    """
+    music = AudioFileClip(music_path)
+    try:
+        samples = music.to_soundarray(fps=AUDIO_FPS)
+    finally:
+        music.close()
+    samples.flags.writeable = False
+    return samples
+
+
+def _resize_crop(frame: np.ndarray, y: int, x: int,
+                 crop_h: int, crop_w: int, out: np.ndarray) -> np.ndarray:
+    """
+    Scale a crop window of a uint8 frame back up to the full frame size in
+    out, without promoting pixels to floating point.
+    """
+    h, w = frame.shape[:2]
+    if cv2 is not None:
+        return cv2.resize(
+            frame[y:y+crop_h, x:x+crop_w], (w, h), dst=out,
+            interpolation=cv2.INTER_LINEAR
+        )
+    if HAVE_NUMBA:
+        return _bilinear_crop_zoom(frame, out, y, x, crop_h, crop_w)
+    
+    # Last resort without a compiled kernel: nearest-neighbour gather
+    rows = y + (np.arange(h) * crop_h // h)
+    cols = x + (np.arange(w) * crop_w // w)
+    out[:] = frame[rows[:, None], cols]
+    return out
+
+
+def _escape_filter_value(value: str) -> str:
+    """
+    Quote a value, such as a file path, for use as a filter option in an
+    FFmpeg filter graph.
+    
+    The graph parser and then the option parser each unescape the value,
+    so ':', '\\' and quotes are escaped for the option parser and the
+    result is single-quoted for the graph parser.
+    """
+    value = value.replace("\\", "\\\\").replace(":", "\\:").replace("'", "\\'")
+    return "'" + value.replace("'", "'\\''") + "'"
+
+
+def new_render_pool(max_workers: int) -> ProcessPoolExecutor:
+    """
+    Create a render process pool that logs through the parent's queue.
+    
+    Workers use get_mp_context(), the context the logging queue is created
+    in, rather than fork.
+    """
+    return ProcessPoolExecutor(
+        max_workers=max_workers,
+        mp_context=get_mp_context(),
+        initializer=init_worker_logging,
+        initargs=(get_log_queue(), logging.getLogger().level)
+    )
 
 
 class VideoProcessor:
@@ -30,7 +189,10 @@ class VideoProcessor:
                     text_hook: Optional[str] = None,
                     add_zoom: bool = True,
                     music_path: Optional[str] = None,
-                    aspect_ratio: str = "9:16") -> Dict[str, str]:
+                    aspect_ratio: str = "9:16",
+                    threads: int = 4,
+                    source: Optional[VideoFileClip] = None,
+                    vertical_plan: Optional[Dict] = None) -> Dict[str, str]:
         """
         Create a viral clip from video segment.
         
@@ -43,16 +205,36 @@ class VideoProcessor:
             add_zoom: Whether to add cinematic zoom effect
             music_path: Path to background music
             aspect_ratio: Target aspect ratio (9:16 for vertical)
+            threads: FFmpeg encoder threads
+            source: Already open clip of video_path; the clip is then cut
+                from it with MoviePy directly, and it is left open for the
+                caller to close
+            vertical_plan: Precomputed _plan_vertical result for the source
             
         Returns:
             Dictionary with output paths and metadata
         """
+        if source is None:
+            result = self._render_with_ffmpeg(
+                video_path, start_time, end_time, output_name,
+                text_hook=text_hook,
+                add_zoom=add_zoom,
+                music_path=music_path,
+                threads=threads,
+                vertical_plan=vertical_plan
+            )
+            if result is not None:
+                return result
+        
+        own_source = source is None
         try:
             # Load video segment
-            video = VideoFileClip(video_path).subclip(start_time, end_time)
+            if own_source:
+                source = VideoFileClip(video_path)
+            video = source.subclip(start_time, end_time)
             
             # Convert to 9:16 aspect ratio
-            video = self._convert_to_vertical(video)
+            video = self._convert_to_vertical(video, vertical_plan)
             
             # Add cinematic zoom effect
             if add_zoom:
@@ -74,17 +256,16 @@ class VideoProcessor:
                 output_path,
                 codec='libx264',
                 audio_codec='aac',
-                fps=30,
+                fps=OUTPUT_FPS,
                 preset='medium',
-                threads=4,
+                threads=threads,
                 logger=None
             )
             
             # Generate thumbnail
-            thumbnail_path = self._generate_thumbnail(video, output_name)
-            
-            # Clean up
-            video.close()
+            thumbnail_path = self._generate_thumbnail(
+                output_path, video.duration, output_name, video=video
+            )
             
             return {
                 'video_path': output_path,
@@ -101,47 +282,421 @@ class VideoProcessor:
                 'success': False,
                 'error': str(e),
             }
+        finally:
+            # Subclips share the source's reader, so only the source is closed
+            if own_source and source is not None:
+                source.close()
+    
+    def _render_with_ffmpeg(self,
+                            video_path: str,
+                            start_time: float,
+                            end_time: float,
+                            output_name: str,
+                            text_hook: Optional[str] = None,
+                            add_zoom: bool = True,
+                            music_path: Optional[str] = None,
+                            threads: int = 4,
+                            vertical_plan: Optional[Dict] = None,
+                            **kwargs) -> Optional[Dict[str, str]]:
+        """
+        Render a clip with FFmpeg, or return None so MoviePy is used instead.
+        
+        FFmpeg does the whole clip natively; only the zoom effect needs
+        frames in Python, piped between a decoder and an encoder. Takes the
+        same arguments as create_clip and ignores the ones it doesn't use.
+        """
+        render = self._piped_zoom_clip if add_zoom else self._fast_ffmpeg_clip
+        return render(
+            video_path, start_time, end_time, output_name,
+            text_hook=text_hook,
+            music_path=music_path,
+            threads=threads,
+            vertical_plan=vertical_plan
+        )
+    
+    def _fast_ffmpeg_clip(self,
+                          video_path: str,
+                          start_time: float,
+                          end_time: float,
+                          output_name: str,
+                          text_hook: Optional[str] = None,
+                          music_path: Optional[str] = None,
+                          threads: int = 4,
+                          vertical_plan: Optional[Dict] = None) -> Optional[Dict[str, str]]:
+        """
+        Create a clip with a single FFmpeg run: seek, scale/crop/pad to
+        9:16, draw the text hook and mix in music, without decoding frames
+        into Python.
+        
+        Args:
+            video_path: Path to source video
+            start_time: Start time in seconds
+            end_time: End time in seconds
+            output_name: Name for output file
+            text_hook: Text overlay for the first 3 seconds
+            music_path: Path to background music
+            threads: FFmpeg encoder threads
+            vertical_plan: Precomputed _plan_vertical result for the source
+            
+        Returns:
+            Same dictionary as create_clip, or None if FFmpeg failed and the
+            MoviePy path should be used instead
+        """
+        duration = end_time - start_time
+        output_path = os.path.join(self.output_dir, f"{output_name}.mp4")
+        hook_path = os.path.join(self.temp_dir, f"{output_name}_hook.txt")
+        
+        cmd = [
+            "ffmpeg", "-y", "-loglevel", "error",
+            "-ss", str(start_time), "-i", video_path,
+        ]
+        music_input = None
+        if music_path and os.path.exists(music_path):
+            cmd += ["-stream_loop", "-1", "-i", music_path]
+            music_input = 1
+        
+        try:
+            # Writes the hook text file, so it's inside the cleanup block
+            filter_graph, audio_map = self._overlay_graph(
+                f"[0:v]{self._vertical_chain(vertical_plan)}",
+                duration, text_hook, hook_path,
+                audio_input=0, music_input=music_input
+            )
+            cmd += self._encode_args(duration, filter_graph, audio_map, threads, output_path)
+            
+            subprocess.run(cmd, check=True, capture_output=True)
+        except (OSError, subprocess.CalledProcessError) as e:
+            stderr = getattr(e, "stderr", b"") or b""
+            log.warning("FFmpeg clip failed, falling back to MoviePy: %s",
+                        stderr.decode(errors="replace").strip() or e)
+            return None
+        finally:
+            if os.path.exists(hook_path):
+                os.remove(hook_path)
+        
+        thumbnail_path = self._generate_thumbnail(output_path, duration, output_name)
+        
+        return {
+            'video_path': output_path,
+            'thumbnail_path': thumbnail_path,
+            'duration': duration,
+            'success': True,
+        }
+    
+    def _piped_zoom_clip(self,
+                         video_path: str,
+                         start_time: float,
+                         end_time: float,
+                         output_name: str,
+                         text_hook: Optional[str] = None,
+                         music_path: Optional[str] = None,
+                         threads: int = 4,
+                         vertical_plan: Optional[Dict] = None) -> Optional[Dict[str, str]]:
+        """
+        Create a zoomed clip with FFmpeg doing everything except the zoom.
+        
+        One FFmpeg process seeks, converts to 9:16 and decodes to raw RGB;
+        Python applies the zoom to each frame and pipes it to a second FFmpeg
+        process, which draws the text hook, mixes audio and encodes.
+        
+        Args:
+            video_path: Path to source video
+            start_time: Start time in seconds
+            end_time: End time in seconds
+            output_name: Name for output file
+            text_hook: Text overlay for the first 3 seconds
+            music_path: Path to background music
+            threads: FFmpeg encoder threads
+            vertical_plan: Precomputed _plan_vertical result for the source
+            
+        Returns:
+            Same dictionary as create_clip, or None if FFmpeg failed and the
+            MoviePy path should be used instead
+        """
+        duration = end_time - start_time
+        output_path = os.path.join(self.output_dir, f"{output_name}.mp4")
+        hook_path = os.path.join(self.temp_dir, f"{output_name}_hook.txt")
+        frame_size = TARGET_WIDTH * TARGET_HEIGHT * 3
+        
+        decode_cmd = [
+            "ffmpeg", "-loglevel", "error",
+            "-ss", str(start_time), "-i", video_path, "-t", str(duration),
+            "-vf", f"{self._vertical_chain(vertical_plan)},fps={OUTPUT_FPS}",
+            "-f", "rawvideo", "-pix_fmt", "rgb24", "-",
+        ]
+        
+        encode_cmd = [
+            "ffmpeg", "-y", "-loglevel", "error",
+            "-f", "rawvideo", "-pix_fmt", "rgb24",
+            "-s", f"{TARGET_WIDTH}x{TARGET_HEIGHT}", "-r", str(OUTPUT_FPS), "-i", "-",
+            "-ss", str(start_time), "-i", video_path,
+        ]
+        music_input = None
+        if music_path and os.path.exists(music_path):
+            encode_cmd += ["-stream_loop", "-1", "-i", music_path]
+            music_input = 2
+        
+        zooms = self._zoom_levels(duration)
+        zoomed = np.empty((TARGET_HEIGHT, TARGET_WIDTH, 3), dtype=np.uint8)
+        raw = bytearray(frame_size)
+        raw_view = memoryview(raw)
+        frame = np.frombuffer(raw, dtype=np.uint8).reshape(TARGET_HEIGHT, TARGET_WIDTH, 3)
+        
+        decoder = encoder = None
+        # Temp files rather than pipes so a chatty stderr can't stall either side
+        with tempfile.TemporaryFile() as decode_err, tempfile.TemporaryFile() as encode_err:
+            try:
+                # Writes the hook text file, so it's inside the cleanup block
+                filter_graph, audio_map = self._overlay_graph(
+                    "[0:v]null", duration, text_hook, hook_path,
+                    audio_input=1, music_input=music_input
+                )
+                encode_cmd += self._encode_args(duration, filter_graph, audio_map,
+                                                threads, output_path)
+                
+                decoder = subprocess.Popen(decode_cmd, stdout=subprocess.PIPE,
+                                           stderr=decode_err)
+                encoder = subprocess.Popen(encode_cmd, stdin=subprocess.PIPE,
+                                           stderr=encode_err)
+                
+                index = 0
+                while True:
+                    # Fill one whole frame; pipe reads can return short
+                    filled = 0
+                    while filled < frame_size:
+                        n = decoder.stdout.readinto(raw_view[filled:])
+                        if not n:
+                            break
+                        filled += n
+                    if filled < frame_size:
+                        break
+                    
+                    current_zoom = zooms[min(index, len(zooms) - 1)]
+                    if current_zoom > 1:
+                        crop_h = int(TARGET_HEIGHT / current_zoom)
+                        crop_w = int(TARGET_WIDTH / current_zoom)
+                        y = (TARGET_HEIGHT - crop_h) // 2
+                        x = (TARGET_WIDTH - crop_w) // 2
+                        encoder.stdin.write(_resize_crop(frame, y, x, crop_h, crop_w, zoomed).data)
+                    else:
+                        encoder.stdin.write(raw_view)
+                    index += 1
+                
+                encoder.stdin.close()
+                failed = decoder.wait() != 0 or encoder.wait() != 0 or index == 0
+            except (OSError, ValueError):
+                failed = True
+            finally:
+                for process in (decoder, encoder):
+                    if process is not None and process.poll() is None:
+                        process.kill()
+                        process.wait()
+                if decoder is not None:
+                    decoder.stdout.close()
+                if os.path.exists(hook_path):
+                    os.remove(hook_path)
+            
+            if failed:
+                decode_err.seek(0)
+                encode_err.seek(0)
+                errors = (decode_err.read() + encode_err.read()).decode(errors="replace")
+                log.warning("FFmpeg zoom pipeline failed, falling back to MoviePy: %s",
+                            errors.strip() or "no output")
+                return None
+        
+        thumbnail_path = self._generate_thumbnail(output_path, duration, output_name)
+        
+        return {
+            'video_path': output_path,
+            'thumbnail_path': thumbnail_path,
+            'duration': duration,
+            'success': True,
+        }
+    
+    def _vertical_chain(self, vertical_plan: Optional[Dict]) -> str:
+        """FFmpeg filters that fit the height, then crop or pad to 9:16."""
+        if vertical_plan is not None:
+            return f"{self._vertical_filter(vertical_plan)},setsar=1"
+        return (
+            f"scale=-2:{TARGET_HEIGHT},"
+            f"crop='min(iw,{TARGET_WIDTH})':{TARGET_HEIGHT},"
+            f"pad={TARGET_WIDTH}:{TARGET_HEIGHT}:(ow-iw)/2:(oh-ih)/2,setsar=1"
+        )
+    
+    def _overlay_graph(self,
+                       video_chain: str,
+                       duration: float,
+                       text_hook: Optional[str],
+                       hook_path: str,
+                       audio_input: int,
+                       music_input: Optional[int]) -> Tuple[str, str]:
+        """
+        Build the filter graph that draws the text hook and mixes in music.
+        
+        Args:
+            video_chain: Labelled video input and filters before the text
+            duration: Clip duration in seconds
+            text_hook: Text overlay for the first 3 seconds
+            hook_path: Temp file the hook text is written to
+            audio_input: Index of the input carrying the source audio
+            music_input: Index of the looped music input, if any
+            
+        Returns:
+            Filter graph ending in [v], and the audio stream to map
+        """
+        video_filter = video_chain
+        
+        if text_hook:
+            # Read the text from a file to avoid filter escaping rules, and
+            # draw it verbatim (expansion=none, so '%' is not a format
+            # sequence); wrapped to roughly the width MoviePy's caption
+            # mode uses
+            with open(hook_path, "w", encoding="utf-8") as f:
+                f.write(textwrap.fill(text_hook, width=24))
+            text_duration = min(3, duration)
+            video_filter += (
+                f",drawtext=textfile={_escape_filter_value(hook_path)}"
+                f":expansion=none:font=Arial:fontsize=70"
+                f":fontcolor=white:borderw=3:bordercolor=black:line_spacing=10"
+                f":x=(w-text_w)/2:y=100:enable='lt(t,{text_duration})'"
+                f":alpha='if(lt(t,0.5),t/0.5,if(gt(t,{text_duration - 0.5}),"
+                f"({text_duration}-t)/0.5,1))'"
+            )
+        filter_graph = video_filter + "[v]"
+        
+        audio_map = f"{audio_input}:a?"
+        if music_input is not None:
+            filter_graph += (
+                f";[{music_input}:a]volume=0.3[music]"
+                f";[{audio_input}:a][music]amix=inputs=2:duration=first:normalize=0[a]"
+            )
+            audio_map = "[a]"
+        
+        return filter_graph, audio_map
+    
+    def _encode_args(self, duration: float, filter_graph: str, audio_map: str,
+                     threads: int, output_path: str) -> List[str]:
+        """FFmpeg output arguments shared by the FFmpeg render paths."""
+        return [
+            "-t", str(duration),
+            "-filter_complex", filter_graph,
+            "-map", "[v]", "-map", audio_map,
+            "-r", str(OUTPUT_FPS),
+            "-c:v", "libx264", "-preset", "medium", "-crf", "20",
+            "-pix_fmt", "yuv420p",
+            "-c:a", "aac",
+            "-threads", str(threads),
+            "-movflags", "+faststart",
+            output_path,
+        ]
+    
+    def _plan_vertical(self, src_w: int, src_h: int) -> Dict:
+        """
+        Decide how a source size maps to 9:16 vertical format.
+        
+        Every clip cut from one source gets the same plan, so it can be
+        computed once and passed to each create_clip call.
+        
+        Args:
+            src_w: Source width in pixels
+            src_h: Source height in pixels
+            
+        Returns:
+            Plan with 'mode' ('crop', 'pad' or 'none'), 'source_size' and
+            'scaled_width'; crop plans include 'x1', pad plans 'x_offset'
+        """
+        # Scale to fit height while maintaining aspect ratio
+        scaled_width = int(round(src_w * TARGET_HEIGHT / src_h))
+        plan = {'mode': 'none', 'source_size': (src_w, src_h), 'scaled_width': scaled_width}
+        
+        # Crop to center if wider than target
+        if scaled_width > TARGET_WIDTH:
+            plan.update(mode='crop', x1=(scaled_width - TARGET_WIDTH) // 2)
+        
+        # Add padding if narrower than target
+        elif scaled_width < TARGET_WIDTH:
+            plan.update(mode='pad', x_offset=(TARGET_WIDTH - scaled_width) // 2)
+        
+        return plan
     
-    def _convert_to_vertical(self, video: VideoFileClip) -> VideoFileClip:
+    def _vertical_filter(self, plan: Dict) -> str:
+        """
+        FFmpeg filter chain equivalent to a _plan_vertical plan.
+        
+        Sizes and offsets are left to FFmpeg's expressions, since it scales
+        frames after autorotating them; a plan from coded dimensions would
+        otherwise stretch rotated footage.
+        """
+        chain = f"scale=-2:{TARGET_HEIGHT}"
+        if plan['mode'] == 'crop':
+            chain += f",crop={TARGET_WIDTH}:{TARGET_HEIGHT}"
+        elif plan['mode'] == 'pad':
+            chain += f",pad={TARGET_WIDTH}:{TARGET_HEIGHT}:(ow-iw)/2:0"
+        return chain
+    
+    def _probe_size(self, video_path: str) -> Optional[Tuple[int, int]]:
+        """
+        Read a video's displayed frame size with ffprobe (coded size with
+        width and height swapped for 90/270 degree rotation), or None if
+        that fails.
+        """
+        try:
+            output = subprocess.run(
+                ["ffprobe", "-v", "error", "-select_streams", "v:0",
+                 "-show_entries",
+                 "stream=width,height:stream_tags=rotate:stream_side_data=rotation",
+                 "-of", "json", video_path],
+                check=True, capture_output=True, text=True
+            ).stdout
+            stream = json.loads(output)["streams"][0]
+            width, height = int(stream["width"]), int(stream["height"])
+            
+            # Older FFmpeg reports a rotate tag, newer a display matrix
+            rotation = stream.get("tags", {}).get("rotate", 0)
+            for side_data in stream.get("side_data_list", []):
+                rotation = side_data.get("rotation", rotation)
+            if int(float(rotation)) % 180 != 0:
+                width, height = height, width
+            return width, height
+        except (OSError, ValueError, KeyError, IndexError,
+                subprocess.CalledProcessError):
+            return None
+    
+    def _convert_to_vertical(self, video: VideoFileClip,
+                             plan: Optional[Dict] = None) -> VideoFileClip:
         """
         Convert video to 9:16 vertical format.
         
         Args:
             video: Source video clip
+            plan: Precomputed _plan_vertical result for the source
             
         Returns:
             Resized vertical video
         """
-        target_width = 1080
-        target_height = 1920
-        
-        # Calculate scaling to fit height while maintaining aspect ratio
-        scale = target_height / video.h
+        # A probed plan can disagree with MoviePy for rotated videos
+        if plan is None or tuple(plan['source_size']) != (video.w, video.h):
+            plan = self._plan_vertical(video.w, video.h)
         
         # Resize video
-        video_resized = video.resize(height=target_height)
+        video_resized = video.resize((plan['scaled_width'], TARGET_HEIGHT))
         
-        # Crop to center if wider than target
-        if video_resized.w > target_width:
-            x_center = video_resized.w / 2
-            x1 = x_center - target_width / 2
-            video_resized = video_resized.crop(x1=x1, width=target_width)
+        if plan['mode'] == 'crop':
+            video_resized = video_resized.crop(x1=plan['x1'], width=TARGET_WIDTH)
         
-        # Add padding if narrower than target
-        elif video_resized.w < target_width:
+        elif plan['mode'] == 'pad':
             # Create black background
             from moviepy.editor import ColorClip
             background = ColorClip(
-                size=(target_width, target_height),
+                size=(TARGET_WIDTH, TARGET_HEIGHT),
                 color=(0, 0, 0),
                 duration=video.duration
             )
             
             # Center video on background
-            x_offset = (target_width - video_resized.w) / 2
             video_resized = CompositeVideoClip([
                 background,
-                video_resized.set_position(('center', 'center'))
+                video_resized.set_position((plan['x_offset'], 0))
             ])
         
         return video_resized
@@ -158,37 +713,58 @@ class VideoProcessor:
         Returns:
             Video with zoom effect
         """
-        duration = video.duration
+        zooms = self._zoom_levels(video.duration, zoom_factor)
+        
+        # Output frames are written into one reused buffer; the encoder
+        # consumes each frame before the next is requested
+        buffers = []
         
         def zoom_in_out(get_frame, t):
             """Apply zoom effect based on time."""
             frame = get_frame(t)
+            current_zoom = zooms[min(int(round(t * OUTPUT_FPS)), len(zooms) - 1)]
+            if current_zoom <= 1:
+                return frame
             
-            # Calculate zoom (zoom in first half, zoom out second half)
-            progress = t / duration
-            if progress < 0.5:
-                current_zoom = 1 + (zoom_factor - 1) * (progress * 2)
-            else:
-                current_zoom = zoom_factor - (zoom_factor - 1) * ((progress - 0.5) * 2)
-            
-            # Apply zoom
-            h, w = frame.shape[:2]
-            new_h, new_w = int(h * current_zoom), int(w * current_zoom)
+            # Resample 8-bit pixels; float frames would move 4-8x the bytes
+            if frame.dtype != np.uint8:
+                frame = np.clip(frame, 0, 255).astype(np.uint8)
             
-            # Resize and crop to original size
-            from scipy.ndimage import zoom as scipy_zoom
-            if current_zoom > 1:
-                zoomed = scipy_zoom(frame, (current_zoom, current_zoom, 1))
-                # Crop to center
-                start_h = (zoomed.shape[0] - h) // 2
-                start_w = (zoomed.shape[1] - w) // 2
-                return zoomed[start_h:start_h+h, start_w:start_w+w]
+            if not buffers or buffers[0].shape != frame.shape:
+                buffers[:] = [np.empty_like(frame)]
             
-            return frame
+            # Crop the visible center region, then scale it back up; same
+            # result as zoom-then-crop but only the kept pixels are resampled
+            h, w = frame.shape[:2]
+            crop_h, crop_w = int(h / current_zoom), int(w / current_zoom)
+            y = (h - crop_h) // 2
+            x = (w - crop_w) // 2
+            return _resize_crop(frame, y, x, crop_h, crop_w, buffers[0])
         
         # Apply the zoom effect
         return video.fl(zoom_in_out)
     
+    def _zoom_levels(self, duration: float,
+                     zoom_factor: float = 1.15) -> np.ndarray:
+        """
+        Zoom level at each output frame: zoom in over the first half of the
+        clip and back out over the second half.
+        
+        Args:
+            duration: Clip duration in seconds
+            zoom_factor: Maximum zoom level
+            
+        Returns:
+            Array with one zoom level per frame at OUTPUT_FPS
+        """
+        times = np.arange(int(np.ceil(duration * OUTPUT_FPS)) + 1) / OUTPUT_FPS
+        progress = np.clip(times / duration, 0, 1)
+        return np.where(
+            progress < 0.5,
+            1 + (zoom_factor - 1) * (progress * 2),
+            zoom_factor - (zoom_factor - 1) * ((progress - 0.5) * 2)
+        )
+    
     def _add_text_overlay(self, video: VideoFileClip, 
                           text: str, 
                           duration: float = 3) -> VideoFileClip:
@@ -204,33 +780,82 @@ class VideoProcessor:
             Video with text overlay
         """
         try:
-            # Create text clip
-            txt_clip = TextClip(
-                text,
-                fontsize=70,
-                color='white',
-                font='Arial-Bold',
-                stroke_color='black',
-                stroke_width=3,
-                method='caption',
-                size=(video.w - 100, None),
-                align='center'
-            )
+            # Rasterize the text once; it is static for its whole duration
+            rgba = self._render_text(text, fontsize=70, max_width=video.w - 100)
             
-            # Position at top center
-            txt_clip = txt_clip.set_position(('center', 100))
-            txt_clip = txt_clip.set_duration(min(duration, video.duration))
+            # Position at top center, clipped to the frame
+            h = min(rgba.shape[0], video.h - 100)
+            w = min(rgba.shape[1], video.w)
+            x = (video.w - w) // 2
+            y = 100
+            rgb = rgba[:h, :w, :3].astype(np.float32)
+            alpha = rgba[:h, :w, 3:4].astype(np.float32) / 255
+            text_duration = min(duration, video.duration)
             
-            # Add fade in/out
-            txt_clip = txt_clip.crossfadein(0.5).crossfadeout(0.5)
+            def blend(get_frame, t):
+                """Alpha-blend the text over frames it is shown on."""
+                frame = get_frame(t)
+                if t >= text_duration:
+                    return frame
+                
+                # Fade in/out over half a second
+                fade = max(0.0, min(1.0, t / 0.5, (text_duration - t) / 0.5))
+                a = alpha * fade
+                frame = frame.copy()
+                region = frame[y:y+h, x:x+w]
+                region[:] = region * (1 - a) + rgb * a
+                return frame
             
-            # Composite with video
-            return CompositeVideoClip([video, txt_clip])
+            return video.fl(blend)
             
         except Exception as e:
-            print(f"Failed to add text overlay: {str(e)}")
+            log.warning("Failed to add text overlay: %s", e)
             return video
     
+    def _render_text(self, text: str, fontsize: int,
+                     max_width: int) -> np.ndarray:
+        """
+        Render centered, word-wrapped white text with a black outline.
+        
+        Args:
+            text: Text to render
+            fontsize: Font size in pixels
+            max_width: Maximum line width in pixels
+            
+        Returns:
+            RGBA image array tightly cropped to the text
+        """
+        font = None
+        for name in OVERLAY_FONTS:
+            try:
+                font = ImageFont.truetype(name, fontsize)
+                break
+            except OSError:
+                continue
+        if font is None:
+            font = ImageFont.load_default()
+        
+        draw = ImageDraw.Draw(Image.new("RGBA", (1, 1)))
+        
+        # Greedy word wrap to max_width
+        lines = []
+        for word in text.split():
+            candidate = f"{lines[-1]} {word}" if lines else word
+            if lines and draw.textlength(candidate, font=font) <= max_width:
+                lines[-1] = candidate
+            else:
+                lines.append(word)
+        wrapped = "\n".join(lines)
+        
+        text_style = dict(font=font, align='center', stroke_width=3)
+        left, top, right, bottom = draw.multiline_textbbox((0, 0), wrapped, **text_style)
+        img = Image.new("RGBA", (right - left, bottom - top), (0, 0, 0, 0))
+        ImageDraw.Draw(img).multiline_text(
+            (-left, -top), wrapped, fill='white', stroke_fill='black', **text_style
+        )
+        
+        return np.asarray(img)
+    
     def _add_background_music(self, video: VideoFileClip, 
                                music_path: str,
                                volume: float = 0.3) -> VideoFileClip:
@@ -246,94 +871,252 @@ class VideoProcessor:
             Video with background music
         """
         try:
-            # Load music
-            music = AudioFileClip(music_path)
-            
-            # Loop or trim music to match video duration
-            if music.duration < video.duration:
-                # Loop music
-                loops = int(video.duration / music.duration) + 1
-                music = concatenate_videoclips([music] * loops)
+            # Load music as PCM samples (decoded once per track per process)
+            music_samples = _load_music(music_path, os.path.getmtime(music_path))
             
-            music = music.subclip(0, video.duration)
-            
-            # Reduce volume
-            music = music.volumex(volume)
+            # Loop or trim music to match video duration, and reduce volume
+            # (np.resize copies, so the shared samples aren't modified)
+            num_samples = int(round(video.duration * AUDIO_FPS))
+            mixed = np.resize(music_samples, (num_samples, music_samples.shape[1])) * volume
             
             # Mix with original audio if exists
             if video.audio:
-                from moviepy.audio.AudioClip import CompositeAudioClip
-                final_audio = CompositeAudioClip([video.audio, music])
-            else:
-                final_audio = music
+                original = video.audio.to_soundarray(fps=AUDIO_FPS)[:num_samples]
+                if original.shape[1] != mixed.shape[1]:
+                    # Mono plus stereo: spread the mono track to both channels
+                    channels = max(original.shape[1], mixed.shape[1])
+                    original = np.repeat(original, channels // original.shape[1], axis=1)
+                    mixed = np.repeat(mixed, channels // mixed.shape[1], axis=1)
+                mixed[:len(original)] += original
+                np.clip(mixed, -1.0, 1.0, out=mixed)
             
-            return video.set_audio(final_audio)
+            return video.set_audio(AudioArrayClip(mixed, fps=AUDIO_FPS))
             
         except Exception as e:
-            print(f"Failed to add background music: {str(e)}")
+            log.warning("Failed to add background music: %s", e)
             return video
     
-    def _generate_thumbnail(self, video: VideoFileClip, 
-                            output_name: str) -> str:
+    def _generate_thumbnail(self, video_path: str,
+                            duration: float,
+                            output_name: str,
+                            video: Optional[VideoFileClip] = None) -> str:
         """
-        Generate thumbnail from video.
+        Generate thumbnail from the middle of a rendered clip.
+        
+        FFmpeg seeks and encodes the JPEG natively; MoviePy is only used if
+        that fails.
         
         Args:
-            video: Source video clip
+            video_path: Path to the rendered clip
+            duration: Clip duration in seconds
             output_name: Base name for thumbnail file
+            video: Already open clip to use for the fallback
             
         Returns:
             Path to thumbnail image
         """
+        # Get frame from middle of video
+        t = duration / 2
+        thumbnail_path = os.path.join(self.output_dir, f"{output_name}_thumb.jpg")
+        
+        try:
+            subprocess.run(
+                ["ffmpeg", "-y", "-loglevel", "error",
+                 "-ss", str(t), "-i", video_path,
+                 "-frames:v", "1", "-q:v", "2", thumbnail_path],
+                check=True, capture_output=True
+            )
+            return thumbnail_path
+        except (OSError, subprocess.CalledProcessError):
+            pass
+        
         try:
-            # Get frame from middle of video
-            t = video.duration / 2
-            frame = video.get_frame(t)
+            if video is None:
+                with VideoFileClip(video_path) as clip:
+                    frame = clip.get_frame(t)
+            else:
+                frame = video.get_frame(t)
             
             # Convert to PIL Image
             img = Image.fromarray(frame)
             
             # Save thumbnail
-            thumbnail_path = os.path.join(self.output_dir, f"{output_name}_thumb.jpg")
             img.save(thumbnail_path, quality=90)
             
             return thumbnail_path
             
         except Exception as e:
-            print(f"Failed to generate thumbnail: {str(e)}")
+            log.warning("Failed to generate thumbnail: %s", e)
             return ""
     
     def create_multiple_clips(self, 
                               video_path: str,
                               segments: List[Dict],
                               base_name: str,
+                              workers: int = 0,
+                              pool: Optional[ProcessPoolExecutor] = None,
                               **kwargs) -> List[Dict]:
         """
         Create multiple clips from a video.
         
+        Clips are independent, so they are rendered in parallel, each
+        encoder using fewer threads to avoid oversubscription. Without zoom
+        FFmpeg does all the work in subprocesses, so threads are enough;
+        zoomed clips run Python per frame and go to worker processes, each
+        opening the source once for its whole share of segments.
+        
         Args:
             video_path: Path to source video
-            segments: List of segments with start/end times
+            segments: List of segments with start/end times, and optionally
+                a 'text_hook' overriding the one in kwargs
             base_name: Base name for output files
+            workers: Clips rendered at once (0 = CPU count, capped at
+                settings.max_render_workers)
+            pool: Process pool for zoomed clips, e.g. one shared between
+                jobs; a pool of `workers` processes is created if omitted
             **kwargs: Additional arguments for create_clip
             
         Returns:
-            List of results for each clip
+            List of results for each clip, in segment order and tagged with
+            its segment index
         """
-        results = []
+        if not segments:
+            return []
+        
+        if workers <= 0:
+            workers = max(1, min(os.cpu_count() or 1, settings.max_render_workers))
+        workers = min(workers, len(segments))
+        threads = kwargs.pop('threads', 2 if workers > 1 else 4)
+        
+        # All segments share the source size, so plan the 9:16 crop/pad once
+        if 'vertical_plan' not in kwargs:
+            size = self._probe_size(video_path)
+            if size is not None:
+                kwargs['vertical_plan'] = self._plan_vertical(*size)
+        
+        text_hook = kwargs.pop('text_hook', None)
+        jobs = [
+            (i, segment['start'], segment['end'], f"{base_name}_clip_{i+1}",
+             segment.get('text_hook', text_hook))
+            for i, segment in enumerate(segments)
+        ]
+        
+        if not kwargs.get('add_zoom', True) and shutil.which("ffmpeg"):
+            return self._create_clips_threaded(
+                video_path, jobs, workers, threads=threads, **kwargs
+            )
+        
+        own_pool = pool is None
+        if own_pool:
+            pool = new_render_pool(workers)
+        try:
+            # Deal segments round-robin so batches have similar total length
+            futures = [
+                pool.submit(
+                    self._create_clip_batch,
+                    video_path,
+                    jobs[w::workers],
+                    threads=threads,
+                    **kwargs
+                )
+                for w in range(workers)
+            ]
+            
+            results = []
+            for future in futures:
+                results.extend(future.result())
+        finally:
+            if own_pool:
+                pool.shutdown()
         
-        for i, segment in enumerate(segments):
-            output_name = f"{base_name}_clip_{i+1}"
+        # Return in segment order
+        results.sort(key=lambda result: result['segment_index'])
+        return results
+    
+    def _create_clips_threaded(self,
+                               video_path: str,
+                               jobs: List[Tuple[int, float, float, str, Optional[str]]],
+                               workers: int,
+                               **kwargs) -> List[Dict]:
+        """
+        Create clips on threads while FFmpeg subprocesses do the encoding.
+        
+        Waiting on a subprocess releases the GIL, so this is as parallel as
+        worker processes without their startup cost or pickling.
+        
+        Args:
+            video_path: Path to source video
+            jobs: (segment index, start, end, output name, text hook) for
+                each clip
+            workers: Number of clips rendered at once
+            **kwargs: Additional arguments for create_clip
             
+        Returns:
+            List of results, each tagged with its segment index
+        """
+        def render(job: Tuple[int, float, float, str, Optional[str]]) -> Dict:
+            i, start_time, end_time, output_name, text_hook = job
             result = self.create_clip(
                 video_path=video_path,
-                start_time=segment['start'],
-                end_time=segment['end'],
+                start_time=start_time,
+                end_time=end_time,
                 output_name=output_name,
+                text_hook=text_hook,
                 **kwargs
             )
-            
             result['segment_index'] = i
-            results.append(result)
+            return result
+        
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            return list(pool.map(render, jobs))
+    
+    def _create_clip_batch(self,
+                           video_path: str,
+                           jobs: List[Tuple[int, float, float, str, Optional[str]]],
+                           **kwargs) -> List[Dict]:
+        """
+        Create several clips from one video, opening the source for MoviePy
+        at most once.
+        
+        Args:
+            video_path: Path to source video
+            jobs: (segment index, start, end, output name, text hook) for
+                each clip
+            **kwargs: Additional arguments for create_clip
+            
+        Returns:
+            List of results, each tagged with its segment index
+        """
+        source = None
+        results = []
+        try:
+            for i, start_time, end_time, output_name, text_hook in jobs:
+                result = self._render_with_ffmpeg(
+                    video_path, start_time, end_time, output_name,
+                    text_hook=text_hook, **kwargs
+                )
+                
+                # Fall back to MoviePy, opening the source on first use; if
+                # the open fails, create_clip retries it and reports the error
+                if result is None:
+                    if source is None:
+                        try:
+                            source = VideoFileClip(video_path)
+                        except Exception:
+                            pass
+                    result = self.create_clip(
+                        video_path=video_path,
+                        start_time=start_time,
+                        end_time=end_time,
+                        output_name=output_name,
+                        text_hook=text_hook,
+                        source=source,
+                        **kwargs
+                    )
+                result['segment_index'] = i
+                results.append(result)
+        finally:
+            if source is not None:
+                source.close()
         
         return results